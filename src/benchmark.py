@@ -0,0 +1,339 @@
+"""
+Offline benchmarks of the hot paths on synthetic data.
+
+    python benchmark.py                                    # scales 1k, 10k and 100k points
+    python benchmark.py --scales 1000 1000000 --cases ndvi_sample_memory containment_index
+    python benchmark.py --save-baseline ../outputs/benchmark_baseline.json
+    python benchmark.py --baseline ../outputs/benchmark_baseline.json
+
+Each case is timed `--repeats` times (setup excluded; min and median are reported), then run
+once more under tracemalloc for its peak Python heap allocation, NumPy arrays included. Results
+are written as JSON; with `--baseline` every case is compared with the stored run and the exit
+status is 1 if any is slower than the tolerance allows. Differences under `--min-difference`
+(1 ms by default) are timer noise on sub-millisecond cases and never count as a regression.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from shapely.geometry import Point
+import synthetic_data
+from map_renderer import render_fire_map_html
+from ndvi_loader import NDVILoader
+from region import RegionIndex
+from region_mask import RegionMask
+from simulator import FireSimulator
+from spread_loader import load_spread_points
+from spread_writer import pa, write_spread
+from vectorized_simulator import VectorizedFireSimulator
+
+DEFAULT_SCALES = [1000, 10000, 100000]
+SPREAD_FORMATS = ["parquet", "arrow", "npz", "json"] if pa is not None else ["npz", "json"]
+# Simulation parameters of the simulate_* cases (main.py defaults)
+RISK_THRESHOLD = 0.3
+MAX_SPREAD_DISTANCE = 0.2
+
+
+class BenchmarkData:
+    """
+    Synthetic inputs shared by the cases, generated once per run in `workdir`.
+
+    Parameters:
+    - workdir: Directory for rasters and written outputs.
+    - resolution: NDVI pixel size in degrees.
+    - region_count, region_vertices: Number and detail of the region polygons.
+    - seed: Seed of every generator.
+    """
+    def __init__(self, workdir, resolution=0.01, region_count=6, region_vertices=2000, seed=0):
+        self.workdir = workdir
+        self.seed = seed
+        self.ndvi_path = synthetic_data.write_ndvi_raster(
+            os.path.join(workdir, "ndvi.tif"), resolution=resolution, seed=seed
+        )
+        self.tiled_ndvi_path = synthetic_data.write_ndvi_raster(
+            os.path.join(workdir, "ndvi_tiled.tif"), resolution=resolution, seed=seed, tiled=True
+        )
+        self.regions = synthetic_data.make_regions(region_count, vertices=region_vertices, seed=seed)
+        self.ndvi_loader = NDVILoader(self.ndvi_path, mode="memory")
+        self._ignitions = {}
+        self._spread = {}
+
+    def ignitions(self, n):
+        if n not in self._ignitions:
+            self._ignitions[n] = synthetic_data.make_ignitions(n, seed=self.seed)
+        return self._ignitions[n]
+
+    def spread_columns(self, n):
+        if n not in self._spread:
+            self._spread[n] = synthetic_data.make_spread_columns(n, seed=self.seed)
+        return self._spread[n]
+
+    def path(self, name):
+        return os.path.join(self.workdir, name)
+
+
+# Each case takes (data, scale) and returns the callable to time; setup work happens before it.
+
+def ndvi_sample_memory(data, n):
+    points = data.ignitions(n)
+    return lambda: data.ndvi_loader.get_ndvi_many(points.x, points.y)
+
+
+def ndvi_sample_tiled(data, n):
+    points = data.ignitions(n)
+    loader = NDVILoader(data.tiled_ndvi_path, mode="tiled", cache_bytes=64 * 2**20)
+
+    def run():
+        loader.tile_cache.clear()  # every run starts cold
+        return loader.get_ndvi_many(points.x, points.y)
+    return run
+
+
+def ndvi_sample_scalar(data, n):
+    points = data.ignitions(n)
+    return lambda: [data.ndvi_loader.get_ndvi(x, y) for x, y in zip(points.x.tolist(), points.y.tolist())]
+
+
+def containment_scalar(data, n):
+    points = data.ignitions(n)
+    return lambda: [
+        any(region.contains(Point(x, y)) for region in data.regions)
+        for x, y in zip(points.x.tolist(), points.y.tolist())
+    ]
+
+
+def containment_index(data, n):
+    points = data.ignitions(n)
+    index = RegionIndex(data.regions)
+    return lambda: index.contains_many(points.x, points.y)
+
+
+def containment_raster(data, n):
+    points = data.ignitions(n)
+    loader = data.ndvi_loader
+    mask = RegionMask.rasterize(data.regions, loader.transform, loader.height, loader.width)
+    return lambda: mask.contains_many(points.x, points.y)
+
+
+def simulate_step_scalar(data, n):
+    points = data.ignitions(n).to_points()
+    for pt in points:  # sample NDVI up front, as main.py does
+        pt.ndvi = data.ndvi_loader.get_ndvi(pt.x, pt.y)
+
+    def run():
+        sim = FireSimulator(data.regions, data.path("spread_scalar.json"), region_index=RegionIndex(data.regions))
+        sim.simulate_fire(points, data.ndvi_loader, steps=1, risk_threshold=RISK_THRESHOLD,
+                          max_distance=MAX_SPREAD_DISTANCE)
+    return run
+
+
+def _vectorized_run(data, n, steps, max_frontier=None):
+    points = data.ignitions(n)
+    index = RegionIndex(data.regions)
+
+    def run():
+        sim = VectorizedFireSimulator(
+            data.regions, output=None, seed=data.seed, region_index=index, cell_size_km=1.0,
+            max_frontier=max_frontier
+        )
+        return sim.run(points, data.ndvi_loader, steps=steps, risk_threshold=RISK_THRESHOLD,
+                       max_distance=MAX_SPREAD_DISTANCE)
+    return run
+
+
+def simulate_step(data, n):
+    return _vectorized_run(data, n, steps=1)
+
+
+def simulate_5_steps(data, n):
+    # Uncapped, a few steps burn the whole synthetic area whatever the ignition count; capping the
+    # frontier at the ignition count keeps the work proportional to the scale
+    return _vectorized_run(data, n, steps=5, max_frontier=n)
+
+
+def _spread_write_case(output_format):
+    def case(data, n):
+        columns = data.spread_columns(n)
+        return lambda: write_spread(columns, data.path(f"spread_{n}"), output_format)
+    return case
+
+
+def _spread_load_case(output_format):
+    def case(data, n):
+        path = write_spread(data.spread_columns(n), data.path(f"spread_{n}"), output_format)
+        return lambda: load_spread_points(path)
+    return case
+
+
+def _render_case(mode):
+    def case(data, n):
+        ignitions = data.ignitions(min(n, 1000))
+        spread = pd.DataFrame(data.spread_columns(n))
+        return lambda: render_fire_map_html(
+            data.regions, ignitions, spread, output_path=data.path(f"map_{mode}.html"), mode=mode
+        )
+    return case
+
+
+# name -> (case, largest scale it runs at; None = every scale)
+CASES = {
+    "ndvi_sample_memory": (ndvi_sample_memory, None),
+    "ndvi_sample_tiled": (ndvi_sample_tiled, None),
+    "ndvi_sample_scalar": (ndvi_sample_scalar, 10000),
+    "containment_scalar": (containment_scalar, 10000),
+    "containment_index": (containment_index, None),
+    "containment_raster": (containment_raster, None),
+    "simulate_step_scalar": (simulate_step_scalar, 1000),
+    "simulate_step": (simulate_step, None),
+    "simulate_5_steps": (simulate_5_steps, None),
+    **{f"spread_write_{fmt}": (_spread_write_case(fmt), 100000 if fmt == "json" else None) for fmt in SPREAD_FORMATS},
+    **{f"spread_load_{fmt}": (_spread_load_case(fmt), 100000 if fmt == "json" else None) for fmt in SPREAD_FORMATS},
+    "render_compact": (_render_case("compact"), None),
+    "render_markers": (_render_case("markers"), 1000),
+}
+
+
+def measure(run, repeats):
+    """
+    Time `run` `repeats` times, then once under tracemalloc.
+
+    Returns:
+    - dict: `min_s`, `median_s` and `peak_mb` (peak traced allocation during one run).
+    """
+    times = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeats):
+            started = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - started)
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"min_s": round(min(times), 6), "median_s": round(statistics.median(times), 6),
+            "peak_mb": round(peak / 2**20, 3)}
+
+
+def run_benchmarks(case_names, scales, repeats, data):
+    """Run the selected cases at every scale they support; returns a list of result dicts."""
+    results = []
+    for name in case_names:
+        case, max_scale = CASES[name]
+        for scale in scales:
+            if max_scale is not None and scale > max_scale:
+                continue
+            result = {"case": name, "scale": scale, "repeats": repeats, **measure(case(data, scale), repeats)}
+            result["points_per_second"] = round(scale / max(result["min_s"], 1e-9), 1)
+            results.append(result)
+            print(f"⏱️ {name:<22} {scale:>9,}: {result['min_s']:>9.4f}s min, {result['median_s']:>9.4f}s median, "
+                  f"peak {result['peak_mb']:>8.1f} MB")
+    return results
+
+
+def environment():
+    """Machine and version info stored with the results, to tell incomparable runs apart."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance, min_difference=0.001):
+    """
+    Print each case's min time against the baseline run.
+
+    Parameters:
+    - results: Result dicts of this run.
+    - baseline: Parsed JSON of an earlier run.
+    - tolerance: Allowed relative slowdown (0.2 = 20%) before a case counts as a regression.
+    - min_difference: Seconds; smaller changes of the min time are reported as "same" whatever the ratio.
+
+    Returns:
+    - list: (case, scale, ratio) of the regressions.
+    """
+    base = {(r["case"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n📊 Compared with baseline from {baseline['environment'].get('timestamp')} "
+          f"(commit {baseline['environment'].get('commit')})")
+    for result in results:
+        previous = base.get((result["case"], result["scale"]))
+        if previous is None:
+            continue
+        ratio = result["min_s"] / max(previous["min_s"], 1e-9)
+        if abs(result["min_s"] - previous["min_s"]) < min_difference:
+            status = "same"
+        elif ratio > 1 + tolerance:
+            status = "❌ slower"
+            regressions.append((result["case"], result["scale"], round(ratio, 3)))
+        elif ratio < 1 / (1 + tolerance):
+            status = "✅ faster"
+        else:
+            status = "same"
+        print(f"{result['case']:<22} {result['scale']:>9,}: {previous['min_s']:>9.4f}s -> {result['min_s']:>9.4f}s "
+              f"({ratio:.2f}x) {status}")
+    return regressions
+
+
+def write_results(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"environment": environment(), "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fire simulation hot paths on synthetic data")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="number of points")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--resolution", type=float, default=0.01, help="synthetic NDVI pixel size in degrees")
+    parser.add_argument("--output", default="../outputs/benchmark.json", help="JSON results of this run")
+    parser.add_argument("--baseline", help="earlier results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a regression")
+    parser.add_argument("--min-difference", type=float, default=0.001,
+                        help="seconds; smaller changes are noise, not regressions")
+    parser.add_argument("--save-baseline", help="also store this run's results as the baseline at this path")
+    parser.add_argument("--workdir", help="directory for synthetic data (default: temporary)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="fire_benchmark_")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        print(f"🧪 Generating synthetic data in {workdir}")
+        data = BenchmarkData(workdir, resolution=args.resolution)
+        results = run_benchmarks(args.cases, sorted(args.scales), args.repeats, data)
+        data.ndvi_loader.close()
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    write_results(args.output, results)
+    print(f"✅ Results saved to {args.output}")
+    if args.save_baseline:
+        write_results(args.save_baseline, results)
+        print(f"✅ Baseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance, args.min_difference)
+        if regressions:
+            print(f"❌ {len(regressions)} regressions: {regressions}")
+            raise SystemExit(1)
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+import numpy as np
+from spread_writer import SPREAD_COLUMNS
+
+
+def run_fingerprint(frontier, **params):
+    """
+    Identify a simulation run by its ignition points and parameters, so a checkpoint is only
+    resumed by the run that wrote it.
+
+    Parameters:
+    - frontier: dict of ignition point column arrays.
+    - params: Run parameters (steps, seed, thresholds, ...); values are stringified.
+
+    Returns:
+    - str: JSON fingerprint.
+    """
+    digest = hashlib.sha1()
+    for name in SPREAD_COLUMNS:
+        digest.update(np.ascontiguousarray(frontier[name], dtype=float).tobytes())
+    params = {name: str(value) for name, value in sorted(params.items())}
+    return json.dumps({"ignitions": digest.hexdigest(), **params})
+
+
+def save_checkpoint(path, fingerprint, step, frontier, burned, rng, step_stats, writer_state):
+    """
+    Write the state of a spread run after `step` to a compressed .npz file.
+
+    Parameters:
+    - path: Checkpoint file; written to a temporary file first and renamed, so a crash while
+      saving keeps the previous checkpoint.
+    - fingerprint: Run fingerprint from `run_fingerprint`.
+    - step: Last completed step.
+    - frontier: dict of SPREAD_COLUMNS arrays burning after `step`.
+    - burned: Sorted int64 keys of burned cells.
+    - rng: numpy Generator; its bit generator state is stored.
+    - step_stats: Per-step statistics so far.
+    - writer_state: Resume state of the spread writer (see `open_spread_writer`).
+    """
+    meta = {
+        "fingerprint": fingerprint,
+        "step": int(step),
+        "rng_state": rng.bit_generator.state,
+        "step_stats": step_stats,
+        "writer_state": writer_state,
+    }
+    arrays = {f"frontier_{name}": frontier[name] for name in SPREAD_COLUMNS}
+    tmp_path = path + ".tmp.npz"
+    np.savez_compressed(tmp_path, burned=burned, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, fingerprint):
+    """
+    Load a checkpoint written by `save_checkpoint`.
+
+    Returns:
+    - dict with step, frontier, burned, rng_state, step_stats and writer_state, or None when
+      there is no checkpoint or it belongs to a different run.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta["fingerprint"] != fingerprint:
+            print(f"⚠️ Ignoring checkpoint {path}: it was written by a different run")
+            return None
+        meta["frontier"] = {name: data[f"frontier_{name}"] for name in SPREAD_COLUMNS}
+        meta["burned"] = data["burned"]
+    return meta
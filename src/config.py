@@ -9,10 +9,89 @@ SIBERIAN_REGION_NAMES = [
 ENRICHED_REGIONS_PATH = "../data/siberia_regions_with_weather.geojson"
 ENRICHED_IGNITIONS_PATH = "../data/ignition_with_weather.geojson"
 NDVI_PATH = "../data/modis_ndvi_siberia_2025-06.tif"
+# How NDVILoader reads the raster: "sample" (per lookup), "memory" (whole band), "mmap" (cached .npy)
+# or "tiled" (block windows with an LRU tile cache, for rasters larger than memory)
+NDVI_LOAD_MODE = "memory"
+# "tiled" mode: tile edge in pixels for untiled GeoTIFFs and the tile cache budget
+NDVI_TILE_SIZE = 512
+NDVI_TILE_CACHE_MB = 256
+# Region geometries: optional simplification tolerance in degrees (None keeps full resolution) and a
+# preprocessed binary cache next to ENRICHED_REGIONS_PATH for fast startup
+REGION_SIMPLIFY_TOLERANCE = None
+REGION_CACHE = True
+# Region test used during spread: "polygon" (exact, RegionIndex) or "raster" (RegionMask cached next to NDVI_PATH)
+REGION_LOOKUP = "polygon"
 
 FIRE_SPREAD_PATH = "../outputs/spread_points.json"
+# Spread output: "parquet", "arrow", "npz" or "json"; the suffix of FIRE_SPREAD_PATH follows the format.
+# Parquet and Arrow need pyarrow and fall back to "npz" without it.
+SPREAD_OUTPUT_FORMAT = "parquet"
+# Spread columns read back for rendering (None reads all of them)
+SPREAD_RENDER_COLUMNS = None
 MAP_OUTPUT_PATH = "../outputs/fire_map.html"
+GRID_BURN_STEPS_PATH = "../outputs/burn_steps.tif"
 
 WIND_RANDOM_SPREAD = 16
 
+# Simulation run parameters
+SIMULATION_STEPS = 1
+RISK_THRESHOLD = 0.3
+MAX_SPREAD_DISTANCE = 0.2  # degrees per step, before the wind bias
+
+# main.py caches each stage's result here, keyed by input file hashes and parameters
+PIPELINE_CACHE_DIR = "../outputs/.pipeline_cache"
+
+# Spread engine: "vectorized" (NumPy, seeded), "parallel" (vectorized, multi-process),
+# "grid" (cellular automaton on the NDVI grid), "ensemble" (Monte Carlo burn probability)
+# or "scalar" (original per-point loop)
+SIMULATION_ENGINE = "vectorized"
+RANDOM_SEED = 42
+
+# Ensemble engine: number of seeded realizations and the burn-probability GeoTIFF it writes
+ENSEMBLE_MEMBERS = 20
+BURN_PROBABILITY_PATH = "../outputs/burn_probability.tif"
+
+# Vectorized/parallel engines: spatial-hash dedup cell (km, None = exact 4-decimal keys)
+# and optional cap on new spread points per step (None = unlimited)
+SPREAD_CELL_KM = 1.0
+MAX_FRONTIER = None
+
+# Risk of spread points: "point" (inherited from the parent point) or "raster" (read by cell from a
+# risk grid scored from the region weather on the NDVI grid, saved to RISK_RASTER_PATH).
+# Used by the vectorized, parallel and ensemble engines.
+RISK_SOURCE = "point"
+RISK_RASTER_PATH = "../outputs/risk.tif"
+
+# Weather of spread points: "point" (inherited from the parent point) or "field" (interpolated from
+# the gridded weather field written by scripts/weather_loader.py in grid mode)
+WEATHER_SOURCE = "point"
+WEATHER_FIELD_PATH = "../data/weather_field.npz"
+
+# Vectorized engine: save the run state every N steps (None = never) so an interrupted run
+# resumes from the last checkpoint when restarted with the same inputs
+CHECKPOINT_PATH = "../outputs/spread_checkpoint.npz"
+CHECKPOINT_EVERY = None
+
+# Simulator progress is reported through `logging` at most every N seconds (None disables it).
+# The simulate stage saves its timers and counters next to FIRE_SPREAD_PATH as <name>.metrics.json.
+PROGRESS_EVERY = 5.0
+# Opt-in profiling of the simulate stage: cProfile stats written to PROFILE_PATH (None = off) and
+# the tracemalloc peak and top allocation sites added to the metrics (slows the run down)
+PROFILE_PATH = None
+TRACE_MEMORY = False
+
+# Parallel engine: worker processes (None = all cores) and how ignitions are partitioned
+PARALLEL_WORKERS = None
+PARALLEL_PARTITION = "region"  # "region" or "tile"
+PARALLEL_TILE_SIZE = 5.0  # degrees
+
 MAP_CLUSTERING = 8
+# Map rendering: "compact" (each point layer sent as one data array, markers built in the browser)
+# or "markers" (one folium marker per point). In compact mode, layers with more than
+# MAP_HEATMAP_THRESHOLD points are drawn as a per-step density heatmap of MAP_HEATMAP_BIN_DEG bins.
+MAP_RENDER_MODE = "compact"
+MAP_HEATMAP_THRESHOLD = 50000
+MAP_HEATMAP_BIN_DEG = 0.05
+MAP_HEATMAP_MAX_CELLS = 100000  # bins are coarsened until at most this many are drawn
+# Display simplification of region outlines in degrees (None draws full resolution)
+MAP_SIMPLIFY_TOLERANCE = 0.01
@@ -1,19 +1,147 @@
+import json
+import os
+import numpy as np
+import pandas as pd
 import geopandas as gpd
+import shapely
+from ignition_point import IgnitionPointSet, WEATHER_DEFAULTS
 from region import Region
+from region_mask import _file_fingerprint
 
-def load_regions(file_path):
-    gdf = gpd.read_file(file_path)
-
-    regions = []
-    for _, row in gdf.iterrows():
-        region = Region(
-            region_id=row["NAME_1"],
-            geometry=row["geometry"],
-            temperature=row["temperature"],
-            humidity=row["humidity"],
-            wind_speed=row.get("wind_speed", 0.0),
-            wind_direction=row.get("wind_direction", "N")
+try:
+    import pyogrio
+except ImportError:  # optional: geopandas falls back to its default reader
+    pyogrio = None
+
+# Bump to invalidate region caches written by an older preprocessing
+REGION_CACHE_VERSION = 2
+# Region attributes and their defaults for files that lack them
+REGION_ATTRIBUTES = {"temperature": None, "humidity": None, "wind_speed": 0.0, "wind_direction": "N"}
+
+
+def read_table(file_path, columns=None):
+    """
+    Read a vector file into a GeoDataFrame, through pyogrio's Arrow reader when available.
+
+    Parameters:
+    - file_path: Any OGR-readable file (GeoJSON, GeoPackage, Shapefile, ...).
+    - columns: Attribute columns to read (None reads all); names missing from the file are skipped.
+    """
+    if pyogrio is None:
+        gdf = gpd.read_file(file_path)
+        return gdf if columns is None else gdf[[c for c in columns if c in gdf.columns] + ["geometry"]]
+    if columns is not None:
+        fields = set(pyogrio.read_info(file_path)["fields"])
+        columns = [c for c in columns if c in fields]
+    try:
+        return pyogrio.read_dataframe(file_path, columns=columns, use_arrow=True)
+    except ImportError:  # use_arrow needs pyarrow
+        return pyogrio.read_dataframe(file_path, columns=columns)
+
+
+def default_regions_cache_path(file_path):
+    """Preprocessed region cache, stored next to the region file."""
+    return os.path.splitext(file_path)[0] + ".cache.npz"
+
+
+def load_regions(file_path, simplify_tolerance=None, cache=False, cache_path=None):
+    """
+    Load regions from a vector file, building Region objects straight from the columns.
+
+    Parameters:
+    - file_path: Region file with a `NAME_1` column and the weather attributes.
+    - simplify_tolerance: Optional tolerance (in degrees) to simplify geometries with before
+      containment tests; simplified geometries are repaired with `make_valid`.
+    - cache: Save the preprocessed regions (WKB geometries plus attribute arrays) and reuse them
+      while the region file and the tolerance are unchanged. Attributes are stored as float
+      arrays (NaN for missing values) or, for text columns, str arrays, so the cache loads
+      without pickle.
+    - cache_path: Cache file; defaults to `<region file>.cache.npz`.
+
+    Returns:
+    - list: Region objects in file order.
+    """
+    cache_path = cache_path or default_regions_cache_path(file_path)
+    fingerprint = json.dumps({
+        "version": REGION_CACHE_VERSION,
+        "regions": _file_fingerprint(file_path),
+        "simplify_tolerance": simplify_tolerance,
+    })
+
+    if cache and os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            if str(cached["fingerprint"]) == fingerprint:
+                offsets = cached["wkb_offsets"]
+                wkb = cached["wkb"].tobytes()
+                geometries = shapely.from_wkb([wkb[a:b] for a, b in zip(offsets[:-1], offsets[1:])])
+                columns = {name: cached[name] for name in ["region_id", *REGION_ATTRIBUTES]}
+                return _build_regions(columns, geometries)
+
+    gdf = read_table(file_path)
+    n = len(gdf)
+    columns = {"region_id": gdf["NAME_1"].to_numpy(dtype=str)}
+    for name, default in REGION_ATTRIBUTES.items():
+        columns[name] = _attribute_array(gdf[name] if name in gdf.columns else pd.Series([default] * n))
+    geometries = gdf.geometry.to_numpy()
+    if simplify_tolerance:
+        geometries = shapely.simplify(geometries, simplify_tolerance, preserve_topology=True)
+        invalid = ~shapely.is_valid(geometries)
+        geometries[invalid] = shapely.make_valid(geometries[invalid])
+
+    if cache:
+        wkb = shapely.to_wkb(geometries)
+        offsets = np.concatenate([[0], np.cumsum([len(b) for b in wkb])]).astype(np.int64)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path, fingerprint=np.array(fingerprint), wkb=np.frombuffer(b"".join(wkb), dtype=np.uint8),
+            wkb_offsets=offsets, **columns
         )
-        regions.append(region)
+        os.replace(tmp_path, cache_path)
+    return _build_regions(columns, geometries)
+
+
+def _attribute_array(values):
+    """
+    Region attribute column as a float array with NaN for missing values, or as a str array with
+    "" for missing values when the column holds text.
+    """
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.notna().sum() == values.notna().sum():
+        return numeric.to_numpy(dtype=float)
+    return values.fillna("").astype(str).to_numpy(dtype=str)
+
+
+def _attribute_values(array):
+    """Attribute array as a list of Python values, with None for missing values."""
+    missing = np.isnan(array) if array.dtype.kind == "f" else array == ""
+    return [None if is_missing else value for value, is_missing in zip(array.tolist(), missing.tolist())]
+
+
+def _build_regions(columns, geometries):
+    region_ids = columns["region_id"].tolist()
+    values = {name: _attribute_values(columns[name]) for name in REGION_ATTRIBUTES}
+    return [
+        Region(
+            region_id=region_ids[i],
+            geometry=geometries[i],
+            temperature=values["temperature"][i],
+            humidity=values["humidity"][i],
+            wind_speed=values["wind_speed"][i],
+            wind_direction=values["wind_direction"][i]
+        )
+        for i in range(len(geometries))
+    ]
+
+
+def load_ignition_points(file_path, ndvi_loader=None):
+    """
+    Load ignition points into an IgnitionPointSet, reading only the weather columns.
 
-    return regions
+    Parameters:
+    - file_path: Enriched ignition point file (any CRS; points are reprojected to WGS84).
+    - ndvi_loader: Optional NDVILoader to sample NDVI for all points.
+    """
+    gdf = read_table(file_path, columns=list(WEATHER_DEFAULTS))
+    if gdf.crs is not None and gdf.crs.to_epsg() != 4326:
+        gdf = gdf.to_crs(epsg=4326)
+    return IgnitionPointSet.from_geodataframe(gdf, ndvi_loader=ndvi_loader)
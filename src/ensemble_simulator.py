@@ -0,0 +1,125 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import rasterio
+import config
+from instrumentation import Instrumentation
+from parallel_simulator import _init_worker, _worker, region_lookup_kind
+from vectorized_simulator import VectorizedFireSimulator, points_to_columns
+
+
+def _run_members(seeds, frontier, steps, risk_threshold, max_distance, cell_size_km, max_frontier):
+    """
+    Run one ensemble member per seed in a worker process.
+
+    Returns:
+    - (counts, summary): summed hit counts of the members and their combined instrumentation summary.
+    """
+    ndvi_loader = _worker["ndvi_loader"]
+    counts = np.zeros((ndvi_loader.height, ndvi_loader.width), dtype=np.uint32)
+    instrumentation = Instrumentation(report=False)
+    for seed in seeds:
+        sim = VectorizedFireSimulator(
+            _worker["regions"], output=None, seed=seed, region_index=_worker["region_index"],
+            cell_size_km=cell_size_km, max_frontier=max_frontier, risk_raster=_worker["risk_raster"],
+            weather_field=_worker["weather_field"], instrumentation=instrumentation
+        )
+        cells = [burned_cells(frontier, ndvi_loader)]
+        for _, spread in sim.iter_steps(frontier, ndvi_loader, steps, risk_threshold, max_distance):
+            cells.append(burned_cells(spread, ndvi_loader))
+        # A cell counts once per member however many of its points burned
+        counts.flat[np.unique(np.concatenate(cells))] += 1
+    return counts, instrumentation.summary()
+
+
+def burned_cells(columns, ndvi_loader):
+    """Flat NDVI-grid cell indices of the points in `columns` (points off the grid are dropped)."""
+    rows, cols, inside = ndvi_loader.index(columns["x"], columns["y"])
+    return rows[inside] * ndvi_loader.width + cols[inside]
+
+
+class EnsembleFireSimulator(VectorizedFireSimulator):
+    """
+    Monte Carlo ensemble of the vectorized spread model.
+
+    Runs `members` realizations, each with its own seed spawned from `seed`, spread over worker
+    processes in contiguous batches. Every member marks the NDVI cells its ignition and spread
+    points fall in, and the marks are summed into a hit-count grid as members finish, so no
+    spread points are kept or written. The burn probability of a cell is its hit count divided
+    by the number of members; it does not depend on the worker count.
+
+    Parameters:
+    - regions, seed, region_index, cell_size_km, max_frontier: As for VectorizedFireSimulator.
+    - output: Burn-probability GeoTIFF, aligned with the NDVI raster.
+    - members: Number of realizations.
+    - workers: Number of worker processes (None uses all CPU cores).
+    - regions_path, ndvi_path: Files each worker loads in its initializer.
+    - risk_raster_path: Optional RiskRaster GeoTIFF loaded by every worker.
+    - weather_field_path: Optional WeatherField .npz loaded by every worker.
+    """
+
+    def __init__(self, regions, output, members=20, seed=None, region_index=None, cell_size_km=None,
+                 max_frontier=None, workers=None, regions_path=config.ENRICHED_REGIONS_PATH,
+                 ndvi_path=config.NDVI_PATH, risk_raster_path=None, weather_field_path=None):
+        super().__init__(
+            regions, output, seed=seed, region_index=region_index, cell_size_km=cell_size_km,
+            max_frontier=max_frontier
+        )
+        self.members = members
+        self.workers = workers or os.cpu_count()
+        self.regions_path = regions_path
+        self.ndvi_path = ndvi_path
+        self.risk_raster_path = risk_raster_path
+        self.weather_field_path = weather_field_path
+        self.hit_counts = None
+        self.burn_probability = None
+
+    def simulate_fire(self, ignition_points, ndvi_loader, steps=10, risk_threshold=0.4, max_distance=0.2):
+        """
+        Run the ensemble and write the burn-probability raster to `output`.
+
+        Parameters are those of FireSimulator.simulate_fire; `ndvi_loader` provides the grid
+        and load mode, since every worker opens its own loader.
+
+        Returns:
+        - np.ndarray: float32 burn probability per NDVI cell.
+        """
+        self.ignition_points = ignition_points
+        frontier = points_to_columns(ignition_points)
+        seeds = np.random.SeedSequence(self.seed).spawn(self.members)
+        batches = [list(batch) for batch in np.array_split(seeds, min(self.workers, self.members)) if len(batch)]
+        print(f"Simulating {self.members} ensemble members on {len(batches)} workers...")
+
+        self.hit_counts = np.zeros((ndvi_loader.height, ndvi_loader.width), dtype=np.uint32)
+        init_args = (
+            self.regions_path, self.ndvi_path, getattr(ndvi_loader, "mode", "sample"),
+            region_lookup_kind(self.region_index), self.risk_raster_path, self.weather_field_path
+        )
+        with self.instrumentation.timer("members"), \
+                ProcessPoolExecutor(max_workers=len(batches), initializer=_init_worker, initargs=init_args) as pool:
+            futures = [
+                pool.submit(
+                    _run_members, batch, frontier, steps, risk_threshold, max_distance,
+                    self.cell_size_km, self.max_frontier
+                )
+                for batch in batches
+            ]
+            for done, future in enumerate(futures, start=1):
+                counts, summary = future.result()
+                self.hit_counts += counts
+                self.instrumentation.merge(summary)
+                self.instrumentation.progress("Member batches done", done=done, total=len(futures))
+
+        self.burn_probability = (self.hit_counts / self.members).astype(np.float32)
+        with self.instrumentation.timer("write"):
+            self.save_burn_probability(ndvi_loader)
+        return self.burn_probability
+
+    def save_burn_probability(self, ndvi_loader):
+        """Write the burn probability as a float32 GeoTIFF aligned with the NDVI raster."""
+        profile = ndvi_loader.dataset.profile.copy()
+        profile.update(dtype="float32", count=1, nodata=None, compress="deflate")
+        with rasterio.open(self.output, "w", **profile) as dst:
+            dst.write(self.burn_probability, 1)
+        self.output_path = self.output
+        print(f"Saved burn probability of {self.members} members to {self.output_path}")
@@ -0,0 +1,200 @@
+import numpy as np
+import rasterio
+from region_mask import RegionMask
+from vectorized_simulator import VectorizedFireSimulator, WEATHER_COLUMNS, first_occurrences, points_to_columns
+
+UNBURNED, BURNING, BURNED = 0, 1, 2
+
+# Wind directions are quantized into this many sectors, and burning cells are grouped into
+# latitude bands of this many degrees; one spread kernel per (sector, band)
+WIND_SECTORS = 16
+LATITUDE_BAND_DEG = 2.0
+
+
+def spread_kernel(wind_direction, max_distance, pixel_width, pixel_height, latitude):
+    """
+    Grid offsets a fire can reach in one step, following the point model's wind bias.
+
+    A cell at offset (drow, dcol) is reachable when its direction lies within ±90° of the wind
+    and its distance does not exceed `max_distance * (1 + 0.6 * cos(angle difference))`, with
+    longitude distances shrunk by cos(latitude) as in FireSimulator.
+
+    Returns:
+    - np.ndarray of shape (K, 2) with (drow, dcol) offsets, nearest first.
+    """
+    reach = max_distance * 1.6
+    lat_correction = np.cos(np.radians(latitude))
+    max_rows = int(np.ceil(reach / pixel_height))
+    max_cols = int(np.ceil(reach / (pixel_width * lat_correction)))
+    drow, dcol = np.mgrid[-max_rows:max_rows + 1, -max_cols:max_cols + 1]
+    dx = dcol * pixel_width * lat_correction
+    dy = -drow * pixel_height  # rows grow southwards
+    distance = np.hypot(dx, dy)
+    angle = np.degrees(np.arctan2(dy, dx))
+    angle_diff = np.abs((angle - wind_direction + 180) % 360 - 180)
+    reachable = (
+        (distance > 0) & (angle_diff <= 90)
+        & (distance <= max_distance * (1 + 0.6 * np.cos(np.radians(angle_diff))))
+    )
+    order = np.argsort(distance[reachable], kind="stable")
+    return np.column_stack([drow[reachable], dcol[reachable]])[order]
+
+
+class GridFireSimulator(VectorizedFireSimulator):
+    """
+    Cellular-automaton spread on the NDVI raster grid.
+
+    Burn state is kept as arrays on the NDVI grid: `state` (UNBURNED/BURNING/BURNED),
+    `burn_step` (step a cell ignited, -1 if never) and `source` (ignition point whose weather the
+    cell inherited). Every step dilates the burning cells with wind-biased kernels built from the
+    same max_distance/wind-factor logic as the point model, one kernel per wind sector and
+    LATITUDE_BAND_DEG latitude band, and ignites reachable unburned cells with NDVI >= 0.15 inside
+    a region. Cost depends on the burning area
+    of the grid rather than on a growing number of points.
+
+    Parameters:
+    - regions, output, output_format: As for FireSimulator; spread cells are written to `output`.
+    - region_mask: RegionMask on the NDVI grid (rasterized from `regions` if None).
+    - burn_steps_path: Optional GeoTIFF receiving the burn-step grid.
+    """
+
+    def __init__(self, regions, output, region_mask=None, burn_steps_path=None, output_format="json"):
+        super().__init__(regions, output, region_index=region_mask, output_format=output_format)
+        self.region_mask = region_mask
+        self.burn_steps_path = burn_steps_path
+        self.state = None
+        self.burn_step = None
+        self.source = None
+        self.weather = None
+
+    def simulate_fire(self, ignition_points, ndvi_loader, steps=10, risk_threshold=0.4, max_distance=0.2):
+        """
+        Simulate fire spread over a series of steps on the NDVI grid.
+
+        Parameters are those of FireSimulator.simulate_fire.
+        """
+        self.ignition_points = ignition_points
+        self.run_grid(points_to_columns(ignition_points), ndvi_loader, steps, risk_threshold, max_distance)
+        with self.instrumentation.timer("write"):
+            self.spread_columns = self.burned_cells(ndvi_loader)
+            self.save_spread()
+            if self.burn_steps_path:
+                self.save_burn_steps(ndvi_loader, self.burn_steps_path)
+
+    def run_grid(self, frontier, ndvi_loader, steps=10, risk_threshold=0.4, max_distance=0.2):
+        """
+        Run the automaton from ignition points given as column arrays.
+
+        Returns:
+        - np.ndarray: burn-step grid (-1 unburned, 0 ignition cells, k cells ignited at step k).
+        """
+        if self.region_mask is None or not self.region_mask.matches(ndvi_loader):
+            self.region_mask = RegionMask.rasterize(
+                self.regions, ndvi_loader.transform, ndvi_loader.height, ndvi_loader.width
+            )
+        ndvi = ndvi_loader.read_array()
+        burnable = (ndvi >= 0.15) & (self.region_mask.mask > 0)
+
+        self.weather = {name: frontier[name] for name in WEATHER_COLUMNS + ["risk_score"]}
+        spreading_source = frontier["risk_score"] >= risk_threshold
+        sector = np.round(frontier["wind_direction"] / (360 / WIND_SECTORS)).astype(np.int64) % WIND_SECTORS
+
+        shape = (ndvi_loader.height, ndvi_loader.width)
+        self.state = np.full(shape, UNBURNED, dtype=np.uint8)
+        self.burn_step = np.full(shape, -1, dtype=np.int16)
+        self.source = np.full(shape, -1, dtype=np.int32)
+
+        # Seed ignition cells; the first point in a cell provides its weather
+        rows, cols, inside = ndvi_loader.index(frontier["x"], frontier["y"])
+        points = np.flatnonzero(inside)
+        cells = rows[points] * shape[1] + cols[points]
+        first = first_occurrences(cells)
+        self.source.flat[cells[first]] = points[first]
+        self.state[self.source >= 0] = BURNING
+        self.burn_step[self.source >= 0] = 0
+
+        pixel_width, pixel_height = ndvi_loader.transform.a, -ndvi_loader.transform.e
+        kernels = {}
+        for step in range(1, steps + 1):
+            self.instrumentation.start_step(step)
+            burning = self.state == BURNING
+            ignited = np.zeros(shape, dtype=bool)
+            new_source = np.full(shape, -1, dtype=np.int32)
+
+            burning_rows, burning_cols = np.nonzero(burning)
+            cell_source = self.source[burning_rows, burning_cols]
+            spreads = spreading_source[cell_source]
+            cell_sector = sector[cell_source]
+            cell_latitude = ndvi_loader.transform.f - (burning_rows + 0.5) * pixel_height
+            cell_band = np.floor(cell_latitude / LATITUDE_BAND_DEG).astype(np.int64)
+            groups = np.unique(np.column_stack([cell_sector[spreads], cell_band[spreads]]), axis=0)
+            for s, band in groups.tolist():
+                chosen = spreads & (cell_sector == s) & (cell_band == band)
+                if (s, band) not in kernels:
+                    # Shaped for the band's central latitude: the point model shrinks each
+                    # point's east-west reach by its own latitude
+                    kernels[s, band] = spread_kernel(
+                        s * 360 / WIND_SECTORS, max_distance, pixel_width, pixel_height,
+                        (band + 0.5) * LATITUDE_BAND_DEG
+                    )
+                kernel = kernels[s, band]
+                sources = np.full(shape, -1, dtype=np.int32)
+                sources[burning_rows[chosen], burning_cols[chosen]] = cell_source[chosen]
+                self._dilate(sources, kernel, burnable, ignited, new_source)
+
+            self.state[burning] = BURNED
+            self.state[ignited] = BURNING
+            self.burn_step[ignited] = step
+            self.source[ignited] = new_source[ignited]
+            self.instrumentation.end_step(frontier=len(burning_rows), spread=int(ignited.sum()))
+
+            if not ignited.any():
+                self.instrumentation.progress("No further spread", force=True, step=step)
+                break
+        return self.burn_step
+
+    def _dilate(self, sources, kernel, burnable, ignited, new_source):
+        """
+        Ignite unburned burnable cells reached from `sources` through `kernel` offsets, working on
+        the bounding window of the source cells. Nearer offsets and earlier (sector, band) groups win.
+        """
+        rows, cols = np.nonzero(sources >= 0)
+        height, width = sources.shape
+        for drow, dcol in kernel:
+            # Window of target cells reachable with this offset
+            r0, r1 = max(rows.min() + drow, 0), min(rows.max() + drow + 1, height)
+            c0, c1 = max(cols.min() + dcol, 0), min(cols.max() + dcol + 1, width)
+            if r0 >= r1 or c0 >= c1:
+                continue
+            shifted = sources[r0 - drow:r1 - drow, c0 - dcol:c1 - dcol]
+            target = (
+                (shifted >= 0) & burnable[r0:r1, c0:c1]
+                & (self.state[r0:r1, c0:c1] == UNBURNED) & ~ignited[r0:r1, c0:c1]
+            )
+            ignited[r0:r1, c0:c1] |= target
+            new_source[r0:r1, c0:c1][target] = shifted[target]
+
+    def burned_cells(self, ndvi_loader):
+        """
+        Spread cells (burn step >= 1) as column arrays at cell centers, with the weather of the
+        ignition point they inherited from.
+        """
+        rows, cols = np.nonzero(self.burn_step >= 1)
+        order = np.argsort(self.burn_step[rows, cols], kind="stable")
+        rows, cols = rows[order], cols[order]
+        transform = ndvi_loader.transform
+        source = self.source[rows, cols]
+        columns = {name: values[source] for name, values in self.weather.items()}
+        columns["x"] = transform.c + (cols + 0.5) * transform.a
+        columns["y"] = transform.f + (rows + 0.5) * transform.e
+        columns["step"] = self.burn_step[rows, cols].astype(np.int64)
+        columns["ndvi"] = ndvi_loader.get_ndvi_cells(rows, cols, np.ones(len(rows), dtype=bool))
+        return columns
+
+    def save_burn_steps(self, ndvi_loader, path):
+        """Write the burn-step grid as an int16 GeoTIFF aligned with the NDVI raster (nodata -1)."""
+        profile = ndvi_loader.dataset.profile.copy()
+        profile.update(dtype="int16", count=1, nodata=-1, compress="deflate")
+        with rasterio.open(path, "w", **profile) as dst:
+            dst.write(self.burn_step, 1)
+        print(f"Saved burn-step grid to {path}")
@@ -1,7 +1,6 @@
+import numpy as np
 from shapely.geometry import Point
-import config
-from ndvi_loader import NDVILoader
-ndvi_loader = NDVILoader(config.NDVI_PATH)
+from ndvi_loader import get_shared_loader
 
 class IgnitionPoint:
     """
@@ -18,8 +17,13 @@ class IgnitionPoint:
         point (shapely.geometry.Point): Shapely Point object representing this location.
         ndvi (NDVI): NDVI object representing this location.
         risk_score (float): Computed fire risk score based on weather conditions.
+
+    When `ndvi` is None and `lookup_ndvi` is true, NDVI is sampled at (x, y) from `ndvi_loader`
+    or the shared loader of config.NDVI_PATH (left None if that raster cannot be opened); pass
+    `lookup_ndvi=False` for points whose NDVI was already sampled and is missing.
     """
-    def __init__(self, x, y, temperature, humidity, wind_speed, wind_direction):
+    def __init__(self, x, y, temperature, humidity, wind_speed, wind_direction, ndvi=None, ndvi_loader=None,
+                 lookup_ndvi=True):
         self.x = x
         self.y = y
         self.temperature = temperature
@@ -27,11 +31,15 @@ class IgnitionPoint:
         self.wind_speed = wind_speed
         self.wind_direction = wind_direction
         self.point = Point(x, y)
-        self.ndvi = None
-        try:
-            self.ndvi = round(ndvi_loader.get_ndvi(x, y), 3)
-        except:
-            pass
+        self.ndvi = ndvi
+        if ndvi is None and lookup_ndvi:
+            # Not sampled in bulk by the caller: look it up individually
+            try:
+                ndvi_loader = ndvi_loader or get_shared_loader()
+            except OSError:
+                ndvi_loader = None  # raster unavailable; the failed open is not retried per point
+            value = ndvi_loader.get_ndvi(x, y) if ndvi_loader is not None else None
+            self.ndvi = None if value is None else round(value, 3)
         # Calculate risk once and store
         self.risk_score = self.compute_risk_score()
 
@@ -70,3 +78,161 @@ class IgnitionPoint:
                 f"T={self.temperature}°C, H={self.humidity}%, "
                 f"Wind={self.wind_speed} m/s @ {self.wind_direction}°, "
                 f"Risk={self.risk_score})")
+
+
+POINT_COLUMNS = ["x", "y", "temperature", "humidity", "wind_speed", "wind_direction", "ndvi", "risk_score", "step"]
+
+# Defaults used when the enriched ignition file lacks a weather column
+WEATHER_DEFAULTS = {"temperature": 20.0, "humidity": 50.0, "wind_speed": 2.0, "wind_direction": 0.0}
+
+
+def compute_risk_scores(temperature, humidity=None, wind_speed=None):
+    """
+    Vectorized version of `IgnitionPoint.compute_risk_score` for arrays of weather values.
+
+    Can be called with three arrays of any (matching) shape, or with a single table exposing
+    `temperature`, `humidity` and `wind_speed` columns (DataFrame, GeoDataFrame, dict of arrays
+    or IgnitionPointSet); missing table columns fall back to WEATHER_DEFAULTS.
+
+    Returns:
+    - np.ndarray of normalized fire risk scores, rounded to 3 decimals (NaN where weather is NaN).
+    """
+    if humidity is None and wind_speed is None:
+        table = temperature.columns if isinstance(temperature, IgnitionPointSet) else temperature
+        temperature, humidity, wind_speed = (
+            table[name] if name in table else WEATHER_DEFAULTS[name]
+            for name in ("temperature", "humidity", "wind_speed")
+        )
+    temp_norm = np.asarray(temperature, dtype=float) / 45.0
+    humidity_norm = 1 - (np.asarray(humidity, dtype=float) / 100.0)
+    wind_norm = np.minimum(np.asarray(wind_speed, dtype=float) / 10.0, 1.0)
+    return np.round(0.4 * temp_norm + 0.3 * humidity_norm + 0.3 * wind_norm, 3)
+
+
+class IgnitionPointSet:
+    """
+    Columnar store of ignition points: one NumPy array per attribute instead of one object per point.
+
+    Indexing or iterating yields lightweight IgnitionPointView rows, so code written against
+    IgnitionPoint (`pt.x`, `pt.risk_score`, `pt.to_point()`) keeps working. NDVI is NaN where the
+    raster has no value (exposed as None on row views, like IgnitionPoint).
+
+    Parameters:
+    - columns: dict of 1D arrays keyed by POINT_COLUMNS; `risk_score` is computed from the weather
+      columns and `ndvi`/`step` default to NaN/0 when missing.
+    """
+    def __init__(self, columns):
+        n = len(columns["x"])
+        self.columns = {name: np.asarray(columns[name], dtype=float) for name in POINT_COLUMNS[:6]}
+        self.columns["ndvi"] = np.asarray(columns["ndvi"], dtype=float) if "ndvi" in columns else np.full(n, np.nan)
+        self.columns["risk_score"] = (
+            np.asarray(columns["risk_score"], dtype=float) if "risk_score" in columns
+            else compute_risk_scores(self.temperature, self.humidity, self.wind_speed)
+        )
+        self.columns["step"] = np.asarray(columns["step"], dtype=np.int64) if "step" in columns else np.zeros(n, np.int64)
+
+    @classmethod
+    def from_geodataframe(cls, gdf, ndvi_loader=None):
+        """
+        Build the set straight from GeoDataFrame columns (WGS84 point geometries).
+
+        Parameters:
+        - gdf: Enriched ignition points; missing weather columns fall back to WEATHER_DEFAULTS.
+        - ndvi_loader: Optional NDVILoader used to sample NDVI for all points in one call.
+        """
+        n = len(gdf)
+        columns = {"x": gdf.geometry.x.to_numpy(), "y": gdf.geometry.y.to_numpy()}
+        for name, default in WEATHER_DEFAULTS.items():
+            columns[name] = gdf[name].to_numpy(dtype=float) if name in gdf.columns else np.full(n, default)
+        if ndvi_loader is not None:
+            columns["ndvi"] = np.round(ndvi_loader.get_ndvi_many(columns["x"], columns["y"]), 3)
+        return cls(columns)
+
+    @classmethod
+    def from_points(cls, points):
+        """Build the set from IgnitionPoint-like objects."""
+        columns = {
+            name: [np.nan if getattr(p, name, None) is None else getattr(p, name) for p in points]
+            for name in POINT_COLUMNS[:8]
+        }
+        columns["step"] = [getattr(p, "step", None) or 0 for p in points]
+        return cls(columns)
+
+    def __getattr__(self, name):
+        columns = self.__dict__.get("columns", {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.columns["x"])
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return IgnitionPointView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield IgnitionPointView(self, index)
+
+    def take(self, index):
+        """Return a new set holding the rows selected by an index array or boolean mask."""
+        return IgnitionPointSet({name: values[index] for name, values in self.columns.items()})
+
+    def to_points(self):
+        """
+        Materialize IgnitionPoint objects (for the scalar simulator). NDVI is taken from the set
+        as is: points without a value keep `ndvi=None` and are not looked up again.
+        """
+        return [
+            IgnitionPoint(
+                pt.x, pt.y, pt.temperature, pt.humidity, pt.wind_speed, pt.wind_direction, ndvi=pt.ndvi,
+                lookup_ndvi=False
+            )
+            for pt in self
+        ]
+
+    def __repr__(self):
+        return f"IgnitionPointSet({len(self)} points)"
+
+
+class IgnitionPointView:
+    """Read-only row of an IgnitionPointSet with the IgnitionPoint attribute interface."""
+    __slots__ = ("_set", "_index")
+
+    def __init__(self, point_set, index):
+        self._set = point_set
+        self._index = index
+
+    def _value(self, name):
+        return self._set.columns[name][self._index].item()
+
+    x = property(lambda self: self._value("x"))
+    y = property(lambda self: self._value("y"))
+    temperature = property(lambda self: self._value("temperature"))
+    humidity = property(lambda self: self._value("humidity"))
+    wind_speed = property(lambda self: self._value("wind_speed"))
+    wind_direction = property(lambda self: self._value("wind_direction"))
+    risk_score = property(lambda self: self._value("risk_score"))
+    step = property(lambda self: self._value("step"))
+
+    @property
+    def ndvi(self):
+        value = self._value("ndvi")
+        return None if np.isnan(value) else value
+
+    @property
+    def point(self):
+        return Point(self.x, self.y)
+
+    def to_point(self):
+        return self.point
+
+    def __repr__(self):
+        return (f"IgnitionPoint(x={self.x:.4f}, y={self.y:.4f}, "
+                f"T={self.temperature}°C, H={self.humidity}%, "
+                f"Wind={self.wind_speed} m/s @ {self.wind_direction}°, "
+                f"Risk={self.risk_score})")
@@ -0,0 +1,167 @@
+import cProfile
+import json
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def metrics_path(spread_path):
+    """Metrics summary file stored next to the spread output, e.g. `spread_points.metrics.json`."""
+    return os.path.splitext(spread_path)[0] + ".metrics.json"
+
+
+class Instrumentation:
+    """
+    Timers, counters and throttled progress reports for one simulation run.
+
+    Timers and counters are kept for the whole run and, between `start_step` and `end_step`,
+    for the current step as well. They are updated per stage or per batch, never per point, so
+    the overhead stays negligible.
+
+    Parameters:
+    - progress_every: Minimum seconds between progress reports (0 reports every call, None
+      reads config.PROGRESS_EVERY when the instance is created, where None disables them).
+    - callback: Optional callable receiving each progress report as a dict; without one,
+      reports go to this module's logger at INFO level.
+    - report: Emit progress reports at all; workers pass False and leave reporting to the parent.
+    """
+    def __init__(self, progress_every=None, callback=None, report=True):
+        self.progress_every = config.PROGRESS_EVERY if progress_every is None else progress_every
+        self.report = report
+        self.callback = callback
+        self.started = time.perf_counter()
+        self.timers = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.steps = []
+        self.profile_stats = {}
+        self._step = None
+        self._last_progress = float("-inf")
+
+    @contextmanager
+    def timer(self, name):
+        """Add the time spent in the block to timer `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timers[name] += elapsed
+            if self._step is not None:
+                self._step["timers"][name] += elapsed
+
+    def count(self, name, value=1):
+        """Add `value` to counter `name`."""
+        self.counters[name] += int(value)
+        if self._step is not None:
+            self._step["counters"][name] += int(value)
+
+    def start_step(self, step):
+        self._step = {"step": step, "started": time.perf_counter(),
+                      "timers": defaultdict(float), "counters": defaultdict(int)}
+
+    def end_step(self, **fields):
+        """
+        Close the current step, record it with `fields` (e.g. frontier size) and report progress.
+
+        Returns:
+        - dict: the step record.
+        """
+        step, self._step = self._step, None
+        seconds = time.perf_counter() - step.pop("started")
+        record = {
+            "step": step["step"], "seconds": round(seconds, 6), **fields,
+            "candidates_per_second": round(step["counters"].get("candidates", 0) / max(seconds, 1e-9), 1),
+            "timers": {name: round(value, 6) for name, value in step["timers"].items()},
+            "counters": dict(step["counters"]),
+        }
+        self.steps.append(record)
+        self.progress(f"Step {record['step']} done", seconds=record["seconds"], **fields,
+                      candidates_per_second=record["candidates_per_second"])
+        return record
+
+    def progress(self, message, force=False, **fields):
+        """Report progress unless the previous report is less than `progress_every` seconds old."""
+        if not self.report or self.progress_every is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_progress < self.progress_every:
+            return
+        self._last_progress = now
+        report = {"message": message, "elapsed": round(now - self.started, 3), **fields}
+        if self.callback is not None:
+            self.callback(report)
+        else:
+            details = ", ".join(f"{name}={value}" for name, value in fields.items())
+            logger.info("🔁 %s after %.1fs (%s)", message, report["elapsed"], details)
+
+    def merge(self, summary, prefix="worker_"):
+        """Add the counters and (prefixed) timers of another run's `summary`, e.g. from a worker."""
+        for name, value in summary["counters"].items():
+            self.count(name, value)
+        for name, value in summary["timers"].items():
+            self.timers[prefix + name] += value
+
+    @contextmanager
+    def profile(self, cprofile_path=None, trace_memory=False, top=10):
+        """
+        Optionally profile the block with cProfile and/or tracemalloc.
+
+        Parameters:
+        - cprofile_path: File receiving the cProfile stats (open with `pstats` or snakeviz);
+          None skips cProfile.
+        - trace_memory: Trace Python allocations (NumPy arrays included) with tracemalloc.
+        - top: Number of top functions (by cumulative time) and allocation sites kept in the summary.
+        """
+        profiler = cProfile.Profile() if cprofile_path else None
+        if trace_memory:
+            tracemalloc.start()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(cprofile_path)
+                stats = pstats.Stats(profiler).sort_stats("cumulative")
+                functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+                self.profile_stats["cprofile_path"] = cprofile_path
+                self.profile_stats["top_functions"] = [
+                    {"function": f"{path}:{line}({name})", "calls": calls, "cumulative_seconds": round(cumulative, 6)}
+                    for (path, line, name), (_, calls, _, cumulative, _) in functions
+                ]
+            if trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.profile_stats["tracemalloc_peak_mb"] = round(peak / 2**20, 3)
+                self.profile_stats["top_allocations"] = [
+                    {"location": str(stat.traceback[0]), "size_mb": round(stat.size / 2**20, 3), "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:top]
+                ]
+
+    def summary(self):
+        """Run totals, per-step records and profiling results as a JSON-serializable dict."""
+        seconds = time.perf_counter() - self.started
+        return {
+            "seconds": round(seconds, 6),
+            "candidates_per_second": round(self.counters.get("candidates", 0) / max(seconds, 1e-9), 1),
+            "timers": {name: round(value, 6) for name, value in self.timers.items()},
+            "counters": dict(self.counters),
+            "steps": self.steps,
+            "profile": self.profile_stats,
+        }
+
+    def save(self, path, **extra):
+        """Write `summary()` plus `extra` fields (e.g. run parameters) as JSON; returns `path`."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({**extra, **self.summary()}, file, indent=2, default=str)
+        return path
@@ -1,62 +1,205 @@
-import geopandas as gpd
+import argparse
+import logging
+import numpy as np
 import config
-from data_loader import load_regions
-from ignition_point import IgnitionPoint
+from data_loader import load_regions, load_ignition_points
+from ignition_point import IgnitionPointSet
+from ndvi_loader import get_shared_loader, close_shared_loaders
+from region import RegionIndex
+from region_mask import RegionMask
+from risk_raster import RiskRaster
+from weather_field import WeatherField
 from simulator import FireSimulator
+from vectorized_simulator import VectorizedFireSimulator
+from parallel_simulator import ParallelFireSimulator
+from grid_simulator import GridFireSimulator
+from ensemble_simulator import EnsembleFireSimulator
 from map_renderer import render_fire_map_html
-from spread_loader import load_spread_points_from_json
-
-# Step 1: Load enriched regions
-regions = load_regions(config.ENRICHED_REGIONS_PATH)
-print("Loaded region IDs:")
-for r in regions:
-    print(f" - {r.region_id}")
-
-# Step 2: Load enriched ignition points
-print("Loading ignition points with weather...")
-gdf = gpd.read_file(config.ENRICHED_IGNITIONS_PATH).to_crs(epsg=4326)
-
-ignition_points = []
-for _, row in gdf.iterrows():
-    pt = IgnitionPoint(
-        x=row.geometry.x,
-        y=row.geometry.y,
-        temperature=row.get("temperature", 20.0),
-        humidity=row.get("humidity", 50.0),
-        wind_speed=row.get("wind_speed", 2.0),
-        wind_direction=row.get("wind_direction", 0.0)
+from spread_loader import load_spread_points
+from pipeline import Pipeline, Stage
+from instrumentation import metrics_path
+
+SIMULATION_ENGINES = ("vectorized", "parallel", "grid", "ensemble", "scalar")
+REGION_LOOKUPS = ("polygon", "raster")
+RISK_SOURCES = ("point", "raster")
+WEATHER_SOURCES = ("point", "field")
+
+
+def check_config():
+    """Raise ValueError for a config choice that is not one of the known values, e.g. a typo."""
+    choices = {
+        "SIMULATION_ENGINE": SIMULATION_ENGINES, "REGION_LOOKUP": REGION_LOOKUPS,
+        "RISK_SOURCE": RISK_SOURCES, "WEATHER_SOURCE": WEATHER_SOURCES,
+    }
+    for name, allowed in choices.items():
+        value = getattr(config, name)
+        if value not in allowed:
+            raise ValueError(f"Unknown {name} '{value}', expected one of {allowed}")
+
+
+def load_regions_stage():
+    regions = load_regions(
+        config.ENRICHED_REGIONS_PATH, simplify_tolerance=config.REGION_SIMPLIFY_TOLERANCE, cache=config.REGION_CACHE
     )
-    ignition_points.append(pt)
-
-print(f"✓ {len(ignition_points)} ignition points loaded")
-
-# Step 3: Filter points within selected regions
-region_polygons = [r.geometry for r in regions]
-filtered_points = [pt for pt in ignition_points if any(pt.to_point().within(poly) for poly in region_polygons)]
-print(f"✓ {len(filtered_points)} fire points inside selected regions")
-
-# Step 4: Prepare NDVI loader
-from ndvi_loader import NDVILoader
-ndvi_loader = NDVILoader(config.NDVI_PATH)
-
-# Step 5: Run fire simulation
-sim = FireSimulator(regions, config.FIRE_SPREAD_PATH)
-sim.simulate_fire(
-    ignition_points=filtered_points,
-    ndvi_loader=ndvi_loader,
-    steps=1,
-    risk_threshold=0.3,
-    max_distance=0.2
-)
-ndvi_loader.close()
-
-
-# Step 6: Render fire map
-print("Rendering Map")
-spread_gdf = load_spread_points_from_json(config.FIRE_SPREAD_PATH)
-render_fire_map_html(
-    regions=regions,
-    ignition_points=filtered_points,
-    spread_points=list(spread_gdf.itertuples()),
-    output_path=config.MAP_OUTPUT_PATH
-)
+    print("Loaded region IDs:")
+    for r in regions:
+        print(f" - {r.region_id}")
+    return regions
+
+
+def load_ignitions_stage():
+    print("Loading ignition points with weather...")
+    ignition_points = load_ignition_points(config.ENRICHED_IGNITIONS_PATH)
+    print(f"✓ {len(ignition_points)} ignition points loaded")
+    return ignition_points
+
+
+def filter_stage(regions, ignition_points):
+    region_index = RegionIndex(regions)
+    filtered_points = ignition_points.take(region_index.contains_many(ignition_points.x, ignition_points.y))
+    print(f"✓ {len(filtered_points)} fire points inside selected regions")
+    return filtered_points
+
+
+def sample_ndvi_stage(filtered_points):
+    ndvi_loader = get_shared_loader(config.NDVI_PATH, mode=config.NDVI_LOAD_MODE)
+    ndvi = np.round(ndvi_loader.get_ndvi_many(filtered_points.x, filtered_points.y), 3)
+    print(f"✓ NDVI sampled for {len(filtered_points)} points")
+    return IgnitionPointSet({**filtered_points.columns, "ndvi": ndvi})
+
+
+def simulate_stage(regions, filtered_points):
+    check_config()
+    ndvi_loader = get_shared_loader(config.NDVI_PATH, mode=config.NDVI_LOAD_MODE)
+    if config.REGION_LOOKUP == "raster":
+        spread_region_index = RegionMask.load_or_build(regions, config.ENRICHED_REGIONS_PATH, ndvi_loader)
+    else:
+        spread_region_index = RegionIndex(regions)
+
+    risk_raster, risk_raster_path = None, None
+    if config.RISK_SOURCE == "raster":
+        risk_raster = RiskRaster.from_regions(
+            RegionMask.load_or_build(regions, config.ENRICHED_REGIONS_PATH, ndvi_loader)
+        )
+        risk_raster.save(config.RISK_RASTER_PATH, ndvi_loader)
+        risk_raster_path = config.RISK_RASTER_PATH
+
+    weather_field, weather_field_path = None, None
+    if config.WEATHER_SOURCE == "field":
+        weather_field = WeatherField.load(config.WEATHER_FIELD_PATH)
+        weather_field_path = config.WEATHER_FIELD_PATH
+
+    if config.SIMULATION_ENGINE == "grid":
+        sim = GridFireSimulator(
+            regions, config.FIRE_SPREAD_PATH,
+            region_mask=RegionMask.load_or_build(regions, config.ENRICHED_REGIONS_PATH, ndvi_loader),
+            burn_steps_path=config.GRID_BURN_STEPS_PATH, output_format=config.SPREAD_OUTPUT_FORMAT
+        )
+    elif config.SIMULATION_ENGINE == "ensemble":
+        sim = EnsembleFireSimulator(
+            regions, config.BURN_PROBABILITY_PATH, members=config.ENSEMBLE_MEMBERS, seed=config.RANDOM_SEED,
+            region_index=spread_region_index, cell_size_km=config.SPREAD_CELL_KM, max_frontier=config.MAX_FRONTIER,
+            workers=config.PARALLEL_WORKERS, risk_raster_path=risk_raster_path, weather_field_path=weather_field_path
+        )
+    elif config.SIMULATION_ENGINE == "parallel":
+        sim = ParallelFireSimulator(
+            regions, config.FIRE_SPREAD_PATH, seed=config.RANDOM_SEED, region_index=spread_region_index,
+            cell_size_km=config.SPREAD_CELL_KM, max_frontier=config.MAX_FRONTIER,
+            output_format=config.SPREAD_OUTPUT_FORMAT, workers=config.PARALLEL_WORKERS,
+            partition=config.PARALLEL_PARTITION, tile_size=config.PARALLEL_TILE_SIZE,
+            risk_raster_path=risk_raster_path, weather_field_path=weather_field_path
+        )
+    elif config.SIMULATION_ENGINE == "vectorized":
+        sim = VectorizedFireSimulator(
+            regions, config.FIRE_SPREAD_PATH, seed=config.RANDOM_SEED, region_index=spread_region_index,
+            cell_size_km=config.SPREAD_CELL_KM, max_frontier=config.MAX_FRONTIER,
+            output_format=config.SPREAD_OUTPUT_FORMAT, checkpoint_path=config.CHECKPOINT_PATH,
+            checkpoint_every=config.CHECKPOINT_EVERY, risk_raster=risk_raster, weather_field=weather_field
+        )
+    else:
+        sim = FireSimulator(
+            regions, config.FIRE_SPREAD_PATH, region_index=spread_region_index, output_format=config.SPREAD_OUTPUT_FORMAT
+        )
+    with sim.instrumentation.profile(config.PROFILE_PATH, trace_memory=config.TRACE_MEMORY):
+        sim.simulate_fire(
+            ignition_points=filtered_points if config.SIMULATION_ENGINE != "scalar" else filtered_points.to_points(),
+            ndvi_loader=ndvi_loader,
+            steps=config.SIMULATION_STEPS,
+            risk_threshold=config.RISK_THRESHOLD,
+            max_distance=config.MAX_SPREAD_DISTANCE
+        )
+    metrics = sim.instrumentation.save(
+        metrics_path(config.FIRE_SPREAD_PATH), engine=config.SIMULATION_ENGINE, ignition_points=len(filtered_points),
+        parameters=simulation_params()
+    )
+    print(f"📈 Run metrics saved to {metrics}")
+    if ndvi_loader.cache_stats() is not None:
+        print(f"NDVI tile cache: {ndvi_loader.cache_stats()}")
+    close_shared_loaders()
+    return sim.output_path
+
+
+def render_stage(regions, filtered_points, spread_path):
+    print("Rendering Map")
+    if config.SIMULATION_ENGINE == "ensemble":
+        spread_points = None  # the ensemble writes a burn-probability raster instead of points
+    else:
+        spread_points = load_spread_points(spread_path, columns=config.SPREAD_RENDER_COLUMNS)
+    render_fire_map_html(
+        regions=regions,
+        ignition_points=filtered_points,
+        spread_points=spread_points,
+        output_path=config.MAP_OUTPUT_PATH
+    )
+    return config.MAP_OUTPUT_PATH
+
+
+def simulation_params():
+    """Config values the spread result depends on."""
+    names = [
+        "SIMULATION_ENGINE", "RANDOM_SEED", "SIMULATION_STEPS", "RISK_THRESHOLD", "MAX_SPREAD_DISTANCE",
+        "WIND_RANDOM_SPREAD", "SPREAD_CELL_KM", "MAX_FRONTIER", "REGION_LOOKUP", "RISK_SOURCE", "WEATHER_SOURCE",
+        "FIRE_SPREAD_PATH", "SPREAD_OUTPUT_FORMAT", "PARALLEL_PARTITION", "PARALLEL_TILE_SIZE",
+        "ENSEMBLE_MEMBERS", "BURN_PROBABILITY_PATH", "GRID_BURN_STEPS_PATH", "PROFILE_PATH", "TRACE_MEMORY",
+    ]
+    return {name: getattr(config, name) for name in names}
+
+
+STAGES = [
+    Stage(
+        "load_regions", load_regions_stage, files=lambda: [config.ENRICHED_REGIONS_PATH],
+        params=lambda: {"simplify_tolerance": config.REGION_SIMPLIFY_TOLERANCE}
+    ),
+    Stage("load_ignitions", load_ignitions_stage, files=lambda: [config.ENRICHED_IGNITIONS_PATH]),
+    Stage("filter", filter_stage, inputs=["load_regions", "load_ignitions"]),
+    Stage("sample_ndvi", sample_ndvi_stage, inputs=["filter"], files=lambda: [config.NDVI_PATH]),
+    Stage(
+        "simulate", simulate_stage, inputs=["load_regions", "sample_ndvi"],
+        files=lambda: [config.NDVI_PATH, config.WEATHER_FIELD_PATH if config.WEATHER_SOURCE == "field" else None],
+        params=simulation_params, outputs=lambda path: [path]
+    ),
+    Stage(
+        "render", render_stage, inputs=["load_regions", "sample_ndvi", "simulate"],
+        params=lambda: {"columns": config.SPREAD_RENDER_COLUMNS, "clustering": config.MAP_CLUSTERING,
+                        "mode": config.MAP_RENDER_MODE, "heatmap_threshold": config.MAP_HEATMAP_THRESHOLD,
+                        "heatmap_bin": config.MAP_HEATMAP_BIN_DEG,
+                        "heatmap_cells": config.MAP_HEATMAP_MAX_CELLS, "simplify": config.MAP_SIMPLIFY_TOLERANCE,
+                        "output": config.MAP_OUTPUT_PATH, "engine": config.SIMULATION_ENGINE},
+        outputs=lambda path: [path]
+    ),
+]
+
+
+if __name__ == "__main__":
+    stage_names = [stage.name for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Siberian fire spread pipeline")
+    parser.add_argument("--from", dest="rerun_from", choices=stage_names,
+                        help="recompute this stage and every later one even if cached")
+    parser.add_argument("--until", choices=stage_names, help="stop after this stage")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every stage")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    check_config()
+
+    pipeline = Pipeline(STAGES, config.PIPELINE_CACHE_DIR)
+    pipeline.run(rerun_from=args.rerun_from, until=args.until, use_cache=not args.no_cache)
@@ -1,84 +1,85 @@
 import folium
-from folium.plugins import MarkerCluster
+import numpy as np
+import shapely
+from folium.plugins import FastMarkerCluster, HeatMap, HeatMapWithTime, MarkerCluster
 from shapely.geometry import mapping
 import config
 
+# Attributes shown in point popups, in the order they are sent to the browser after lat/lon
+POPUP_COLUMNS = ["ndvi", "risk_score", "temperature", "humidity", "wind_speed", "wind_direction", "step"]
+
+# Builds one circle marker per data row in the browser; the popup HTML is only assembled on click
+POINT_CALLBACK = """
+function (row) {
+    var value = function (v) { return v === null || v === undefined ? '—' : v; };
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 4, color: '%(color)s', fill: true, fillColor: '%(color)s', fillOpacity: 0.8
+    });
+    marker.bindPopup(function () {
+        return '<b>%(title)s</b><br>'
+            + (row[8] ? 'Step: ' + row[8] + '<br>' : '')
+            + 'NDVI: ' + value(row[2]) + '<br>'
+            + 'Risk: ' + value(row[3]) + '<br>'
+            + 'Temp: ' + value(row[4]) + ' °C<br>'
+            + 'Humidity: ' + value(row[5]) + '%%<br>'
+            + 'Wind: ' + value(row[6]) + ' m/s @ ' + value(row[7]) + '°';
+    });
+    return marker;
+}
+"""
+
+
+def render_fire_map_html(regions, ignition_points=None, spread_points=None, output_path='fire_map.html', mode=None):
+    """
+    Render regions, ignition points and spread points to an interactive HTML map.
+
+    Parameters:
+    - regions: Region objects; drawn simplified by `config.MAP_SIMPLIFY_TOLERANCE`.
+    - ignition_points, spread_points: IgnitionPointSet, DataFrame (e.g. from `load_spread_points`)
+      or sequence of point objects; None to skip the layer.
+    - output_path: HTML file to write.
+    - mode: "compact" (default from `config.MAP_RENDER_MODE`) sends each point layer as one data
+      array rendered in the browser, and switches layers larger than `config.MAP_HEATMAP_THRESHOLD`
+      points to a binned density layer per step (at most `config.MAP_HEATMAP_MAX_CELLS` bins); "markers" creates one folium marker per point.
+    """
+    mode = mode or config.MAP_RENDER_MODE
+    ignition_columns = _point_columns(ignition_points)
+    spread_columns = _point_columns(spread_points)
 
-def render_fire_map_html(regions, ignition_points=None, spread_points=None, output_path='fire_map.html'):
     # Calculate map center
-    if ignition_points:
-        center_lat = sum(p.y for p in ignition_points) / len(ignition_points)
-        center_lon = sum(p.x for p in ignition_points) / len(ignition_points)
+    if ignition_columns is not None and len(ignition_columns["x"]):
+        center_lat = float(np.mean(ignition_columns["y"]))
+        center_lon = float(np.mean(ignition_columns["x"]))
     else:
         center_lat, center_lon = 60.0, 90.0  # fallback
 
     m = folium.Map(location=[center_lat, center_lon], zoom_start=5, tiles='cartodbpositron')
+    _add_regions(m, regions, config.MAP_SIMPLIFY_TOLERANCE)
 
-    # Add region polygons
-    for region in regions:
-        geom = mapping(region.geometry)
-        folium.GeoJson(
-            data=geom,
-            name=region.region_id,
-            style_function=lambda x: {
-                'fillColor': 'gray',
-                'color': 'black',
-                'weight': 1,
-                'fillOpacity': 0.3,
-            },
-            tooltip=region.region_id
-        ).add_to(m)
-
-    # 🔴 Ignition points with fast-cluster breakup
-    if ignition_points:
-        ignition_cluster = MarkerCluster(name="Ignition Points", disableClusteringAtZoom=config.MAP_CLUSTERING).add_to(
-            m)
-        for pt in ignition_points:
-            popup_text = (
-                f"<b>Ignition Point</b><br>"
-                f"NDVI: {getattr(pt, 'ndvi', '—')}<br>"
-                f"Risk: {getattr(pt, 'risk_score', '—')}<br>"
-                f"Temp: {getattr(pt, 'temperature', '—')} °C<br>"
-                f"Humidity: {getattr(pt, 'humidity', '—')}%<br>"
-                f"Wind: {getattr(pt, 'wind_speed', '—')} m/s @ {getattr(pt, 'wind_direction', '—')}°"
-            )
-            folium.CircleMarker(
-                location=[pt.y, pt.x],
-                radius=4,
-                color='red',
-                fill=True,
-                fill_color='red',
-                fill_opacity=0.8,
-                popup=popup_text
-            ).add_to(ignition_cluster)
-
-    # 🟠 Spread points with fast-cluster breakup
-    if spread_points:
-        spread_cluster = MarkerCluster(name="Spread Points", disableClusteringAtZoom=config.MAP_CLUSTERING).add_to(m)
-        for pt in spread_points:
-            popup_text = (
-                f"<b>Ignition Point</b><br>"
-                f"NDVI: {getattr(pt, 'ndvi', '—')}<br>"
-                f"Risk: {getattr(pt, 'risk_score', '—')}<br>"
-                f"Temp: {getattr(pt, 'temperature', '—')} °C<br>"
-                f"Humidity: {getattr(pt, 'humidity', '—')}%<br>"
-                f"Wind: {getattr(pt, 'wind_speed', '—')} m/s @ {getattr(pt, 'wind_direction', '—')}°"
+    layers = [
+        (ignition_points, ignition_columns, "Ignition Points", "Ignition Point", "red"),
+        (spread_points, spread_columns, "Spread Points", "Spread Point", "orange"),
+    ]
+    density_layers = []
+    for points, columns, name, title, color in layers:
+        if columns is None or len(columns["x"]) == 0:
+            continue
+        if mode == "markers":
+            _add_marker_layer(m, points, name, title, color)
+        elif len(columns["x"]) > config.MAP_HEATMAP_THRESHOLD:
+            _add_density_layer(
+                m, columns, name.replace("Points", "Density"), config.MAP_HEATMAP_BIN_DEG, config.MAP_HEATMAP_MAX_CELLS
             )
-            folium.CircleMarker(
-                location=[pt.y, pt.x],
-                radius=4,
-                color='orange',
-                fill=True,
-                fill_color='orange',
-                fill_opacity=0.8,
-                popup=popup_text
-            ).add_to(spread_cluster)
+            density_layers.append(title)
+        else:
+            _add_point_layer(m, columns, name, title, color)
 
     # 🧭 Map legend
-    legend_html = """
+    density_legend = "".join(f"🌡️ {title} density<br>" for title in density_layers)
+    legend_html = f"""
     <div style="
         position: fixed;
-        bottom: 40px; left: 40px; width: 170px; height: 110px;
+        bottom: 40px; left: 40px; width: 170px;
         background-color: white;
         border:2px solid gray;
         z-index:9999;
@@ -88,6 +89,7 @@ def render_fire_map_html(regions, ignition_points=None, spread_points=None, outp
         <b>Legend</b><br>
         🔴 Ignition Point<br>
         🟠 Spread Point<br>
+        {density_legend}
     </div>
     """
     m.get_root().html.add_child(folium.Element(legend_html))
@@ -95,3 +97,127 @@ def render_fire_map_html(regions, ignition_points=None, spread_points=None, outp
     folium.LayerControl().add_to(m)
     m.save(output_path)
     print(f"Fire map saved to {output_path}")
+
+
+def _point_columns(points):
+    """Coordinate and popup columns of a point collection as arrays, or None for no points."""
+    if points is None:
+        return None
+    if hasattr(points, "columns"):  # IgnitionPointSet (dict of arrays) or DataFrame
+        source = points.columns if isinstance(points.columns, dict) else points
+        return {name: np.asarray(source[name], dtype=float) for name in ["x", "y", *POPUP_COLUMNS] if name in source}
+    points = list(points)
+    columns = {}
+    for name in ["x", "y", *POPUP_COLUMNS]:
+        values = [getattr(pt, name, None) for pt in points]
+        columns[name] = np.array([np.nan if v is None else v for v in values], dtype=float)
+    return columns
+
+
+def _add_regions(m, regions, tolerance):
+    """Draw all regions as one GeoJSON layer, simplified for display."""
+    geometries = np.array([region.geometry for region in regions], dtype=object)
+    if tolerance:
+        geometries = shapely.simplify(geometries, tolerance, preserve_topology=True)
+    features = [
+        {"type": "Feature", "properties": {"region_id": str(region.region_id)}, "geometry": mapping(geometry)}
+        for region, geometry in zip(regions, geometries)
+    ]
+    folium.GeoJson(
+        data={"type": "FeatureCollection", "features": features},
+        name="Regions",
+        style_function=lambda x: {
+            'fillColor': 'gray',
+            'color': 'black',
+            'weight': 1,
+            'fillOpacity': 0.3,
+        },
+        tooltip=folium.GeoJsonTooltip(fields=["region_id"], labels=False)
+    ).add_to(m)
+
+
+def _add_point_layer(m, columns, name, title, color):
+    """One FastMarkerCluster holding the points as a compact array; markers are built in the browser."""
+    n = len(columns["x"])
+    data = [np.round(columns["y"], 5).astype(object), np.round(columns["x"], 5).astype(object)]
+    for column_name in POPUP_COLUMNS:
+        values = columns.get(column_name, np.full(n, np.nan))
+        column = np.round(values, 3).astype(object)
+        column[np.isnan(values)] = None
+        data.append(column)
+    FastMarkerCluster(
+        np.column_stack(data).tolist(),
+        callback=POINT_CALLBACK % {"color": color, "title": title},
+        name=name,
+        disableClusteringAtZoom=config.MAP_CLUSTERING,
+        chunkedLoading=True,
+    ).add_to(m)
+
+
+def density_bins(xs, ys, steps, bin_deg):
+    """
+    Count points per (step, lat/lon bin).
+
+    Returns:
+    - dict: step -> (bin center lats, bin center lons, counts) arrays, steps ascending.
+    """
+    rows = np.floor(np.asarray(ys, dtype=float) / bin_deg).astype(np.int64)
+    cols = np.floor(np.asarray(xs, dtype=float) / bin_deg).astype(np.int64)
+    steps = np.asarray(steps, dtype=np.int64)
+    row0, col0, step0 = rows.min(), cols.min(), steps.min()
+    height, width = rows.max() - row0 + 1, cols.max() - col0 + 1
+    keys, counts = np.unique(((steps - step0) * height + rows - row0) * width + cols - col0, return_counts=True)
+    key_steps, rest = np.divmod(keys, height * width)
+    key_rows, key_cols = np.divmod(rest, width)
+    bins = {}
+    for step in np.unique(key_steps):
+        selected = key_steps == step
+        bins[int(step + step0)] = (
+            (key_rows[selected] + row0 + 0.5) * bin_deg, (key_cols[selected] + col0 + 0.5) * bin_deg, counts[selected]
+        )
+    return bins
+
+
+def _add_density_layer(m, columns, name, bin_deg, max_cells):
+    """
+    Heatmap of point counts binned on a `bin_deg` grid, with a time slider over steps. The bins
+    are doubled in size until at most `max_cells` non-empty bins remain, which bounds the HTML size.
+    """
+    steps = np.nan_to_num(columns.get("step", np.zeros(len(columns["x"]))))
+    bins = density_bins(columns["x"], columns["y"], steps, bin_deg)
+    while sum(len(counts) for _, _, counts in bins.values()) > max_cells:
+        bin_deg *= 2
+        bins = density_bins(columns["x"], columns["y"], steps, bin_deg)
+    peak = max(int(counts.max()) for _, _, counts in bins.values())
+    frames = [
+        np.column_stack([np.round(lats, 4), np.round(lons, 4), np.round(counts / peak, 3)]).tolist()
+        for lats, lons, counts in bins.values()
+    ]
+    if len(frames) == 1:
+        HeatMap(frames[0], name=name, radius=15).add_to(m)
+    else:
+        HeatMapWithTime(frames, index=[f"Step {step}" for step in bins], name=name, radius=15).add_to(m)
+
+
+def _add_marker_layer(m, points, name, title, color):
+    """One folium CircleMarker with a server-side popup per point (small point counts only)."""
+    cluster = MarkerCluster(name=name, disableClusteringAtZoom=config.MAP_CLUSTERING).add_to(m)
+    rows = points.itertuples() if hasattr(points, "itertuples") else points
+    for pt in rows:
+        popup_text = (
+            f"<b>{title}</b><br>"
+            f"NDVI: {getattr(pt, 'ndvi', '—')}<br>"
+            f"Risk: {getattr(pt, 'risk_score', '—')}<br>"
+            f"Temp: {getattr(pt, 'temperature', '—')} °C<br>"
+            f"Humidity: {getattr(pt, 'humidity', '—')}%<br>"
+            f"Wind: {getattr(pt, 'wind_speed', '—')} m/s @ {getattr(pt, 'wind_direction', '—')}°"
+        )
+        folium.CircleMarker(
+            location=[pt.y, pt.x],
+            radius=4,
+            color=color,
+            fill=True,
+            fill_color=color,
+            fill_opacity=0.8,
+            popup=popup_text
+        ).add_to(cluster)
@@ -1,12 +1,125 @@
+import atexit
+import os
+from collections import OrderedDict
+import numpy as np
 import rasterio
+from rasterio.windows import Window
+import config
+
+NDVI_LOAD_MODES = ("sample", "memory", "mmap", "tiled")
+
+
+def raster_index(transform, height, width, xs, ys):
+    """
+    Convert WGS84 coordinates into row/column indices of a raster grid.
+
+    Returns:
+    - (rows, cols, inside): integer index arrays and a mask of points within the grid.
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    inv = ~transform
+    cols = np.floor(inv.a * xs + inv.b * ys + inv.c).astype(np.int64)
+    rows = np.floor(inv.d * xs + inv.e * ys + inv.f).astype(np.int64)
+    inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    return rows, cols, inside
+
+
+class TileCache:
+    """
+    Least-recently-used cache of decoded raster tiles with a byte budget.
+
+    Parameters:
+    - max_bytes: Total size of cached tile arrays; the least recently used tiles are evicted
+      once it is exceeded (the most recent tile is always kept).
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.tiles = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, read_tile):
+        """Return the tile for `key`, calling `read_tile()` to decode it on a miss."""
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+        self.misses += 1
+        tile = read_tile()
+        self.tiles[key] = tile
+        self.nbytes += tile.nbytes
+        while self.nbytes > self.max_bytes and len(self.tiles) > 1:
+            _, evicted = self.tiles.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+        return tile
+
+    def stats(self):
+        return {
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "tiles": len(self.tiles), "bytes": self.nbytes,
+        }
+
+    def clear(self):
+        self.tiles.clear()
+        self.nbytes = 0
+
 
 class NDVILoader:
-    def __init__(self, tif_path):
+    """
+    Reads NDVI values from a single-band WGS84 GeoTIFF.
+
+    Parameters:
+    - tif_path: Path to the NDVI raster.
+    - mode: "sample" reads from the file on every lookup, "memory" loads the band into a NumPy
+      array once, "mmap" memory-maps a `.npy` copy of the band cached next to the raster,
+      "tiled" reads block windows on demand and keeps decoded tiles in an LRU cache, for
+      rasters that do not fit in memory.
+    - tile_size: Tile edge in pixels for "tiled" mode when the raster is not internally tiled
+      (tiled GeoTIFFs use their own block shape).
+    - cache_bytes: Byte budget of the tile cache in "tiled" mode.
+    """
+    def __init__(self, tif_path, mode="sample", tile_size=512, cache_bytes=256 * 2**20):
+        if mode not in NDVI_LOAD_MODES:
+            raise ValueError(f"Unknown NDVI load mode '{mode}', expected one of {NDVI_LOAD_MODES}")
+        self.tif_path = tif_path
+        self.mode = mode
         self.dataset = rasterio.open(tif_path)
         self.nodata = self.dataset.nodata
+        self.transform = self.dataset.transform
+        self.height = self.dataset.height
+        self.width = self.dataset.width
+        self.array = None
+        self.tile_cache = None
+        if mode == "memory":
+            self.array = self.dataset.read(1)
+        elif mode == "mmap":
+            self.array = self._load_mmap()
+        elif mode == "tiled":
+            if self.dataset.profile.get("tiled"):
+                self.tile_shape = self.dataset.block_shapes[0]
+            else:
+                self.tile_shape = (tile_size, tile_size)
+            self.tile_cache = TileCache(cache_bytes)
+
+    def _load_mmap(self):
+        """Memory-map the cached band, writing the cache first if it is missing or stale."""
+        cache_path = os.path.splitext(self.tif_path)[0] + ".band1.npy"
+        if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(self.tif_path):
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, self.dataset.read(1))
+            os.replace(tmp_path, cache_path)
+        return np.load(cache_path, mmap_mode="r")
 
     def get_ndvi(self, x, y):
         """Return NDVI value at (x, y) in WGS84 coordinates."""
+        if self.array is not None or self.tile_cache is not None:
+            value = self.get_ndvi_many([x], [y])[0]
+            return None if np.isnan(value) else float(value)
         try:
             value = list(self.dataset.sample([(x, y)]))[0][0]
             if self.nodata is not None and value == self.nodata:
@@ -15,5 +128,145 @@ class NDVILoader:
         except Exception:
             return None  # out of bounds or error
 
+    def read_array(self):
+        """Return the whole band as float with NaN for nodata (uses the loaded array if any)."""
+        values = (self.array if self.array is not None else self.dataset.read(1)).astype(float)
+        if self.nodata is not None:
+            values[values == self.nodata] = np.nan
+        return values
+
+    def index(self, xs, ys):
+        """
+        Convert WGS84 coordinates into raster row/column indices through the affine transform.
+
+        Returns:
+        - (rows, cols, inside): integer index arrays and a mask of points within the raster.
+        """
+        return raster_index(self.transform, self.height, self.width, xs, ys)
+
+    def get_ndvi_many(self, xs, ys):
+        """
+        Return NDVI values for arrays of WGS84 coordinates.
+
+        Parameters:
+        - xs, ys: Longitudes and latitudes.
+
+        Returns:
+        - np.ndarray of float, NaN where the raster has nodata or the point is out of bounds.
+        """
+        return self.get_ndvi_cells(*self.index(xs, ys))
+
+    def get_ndvi_cells(self, rows, cols, inside):
+        """Return NDVI values for cells already located with `index` (NaN outside or nodata)."""
+        values = np.full(rows.shape, np.nan)
+        if not inside.any():
+            return values
+        rows, cols = rows[inside], cols[inside]
+        if self.array is not None:
+            sampled = self.array[rows, cols]
+        elif self.tile_cache is not None:
+            sampled = self._sample_tiles(rows, cols)
+        else:
+            # Single windowed read covering all requested cells
+            row0, col0 = rows.min(), cols.min()
+            window = Window(col0, row0, cols.max() - col0 + 1, rows.max() - row0 + 1)
+            sampled = self.dataset.read(1, window=window)[rows - row0, cols - col0]
+        sampled = sampled.astype(float)
+        if self.nodata is not None:
+            sampled[sampled == self.nodata] = np.nan
+        values[inside] = sampled
+        return values
+
+    def _sample_tiles(self, rows, cols):
+        """Sample cells through the tile cache, fetching each tile once per call."""
+        tile_height, tile_width = self.tile_shape
+        tile_rows, tile_cols = rows // tile_height, cols // tile_width
+        keys = tile_rows * (self.width // tile_width + 1) + tile_cols
+        order = np.argsort(keys, kind="stable")
+        _, starts = np.unique(keys[order], return_index=True)
+        sampled = np.empty(len(rows), dtype=self.dataset.dtypes[0])
+        for group in np.split(order, starts[1:]):
+            row0 = tile_rows[group[0]] * tile_height
+            col0 = tile_cols[group[0]] * tile_width
+            tile = self.tile_cache.get((row0, col0), lambda: self._read_tile(row0, col0))
+            sampled[group] = tile[rows[group] - row0, cols[group] - col0]
+        return sampled
+
+    def _read_tile(self, row0, col0):
+        tile_height, tile_width = self.tile_shape
+        window = Window(col0, row0, min(tile_width, self.width - col0), min(tile_height, self.height - row0))
+        return self.dataset.read(1, window=window)
+
+    def cache_stats(self):
+        """Tile cache counters (hits, misses, evictions, tiles, bytes), or None outside "tiled" mode."""
+        return self.tile_cache.stats() if self.tile_cache is not None else None
+
     def close(self):
+        if self.tile_cache is not None:
+            self.tile_cache.clear()
         self.dataset.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Process-wide loaders keyed by (absolute path, mode), opened on first use
+_shared_loaders = {}
+# Errors of rasters that could not be opened, raised again without retrying the open
+_failed_opens = {}
+
+
+def get_shared_loader(tif_path=None, mode=None):
+    """
+    Return the process-wide NDVILoader for a raster, opening it on first use. Each process has
+    its own loaders: a forked worker never reuses the parent's open dataset.
+
+    Parameters:
+    - tif_path: NDVI raster; defaults to config.NDVI_PATH.
+    - mode: Load mode; defaults to config.NDVI_LOAD_MODE. "tiled" loaders use
+      config.NDVI_TILE_SIZE and config.NDVI_TILE_CACHE_MB.
+
+    Raises:
+    - OSError (rasterio's RasterioIOError) if the raster cannot be opened. The failure is
+      remembered, so later calls raise it again without retrying the open.
+    """
+    tif_path = tif_path or config.NDVI_PATH
+    mode = mode or config.NDVI_LOAD_MODE
+    key = (os.path.abspath(tif_path), mode)
+    if key in _failed_opens:
+        raise _failed_opens[key]
+    if key not in _shared_loaders:
+        try:
+            _shared_loaders[key] = NDVILoader(
+                tif_path, mode=mode, tile_size=config.NDVI_TILE_SIZE, cache_bytes=config.NDVI_TILE_CACHE_MB * 2**20
+            )
+        except OSError as e:
+            _failed_opens[key] = e
+            raise
+    return _shared_loaders[key]
+
+
+def _forget_shared_loaders():
+    """
+    Drop the loaders inherited from the parent in a forked child process. A rasterio dataset
+    must not be read from two processes through the same file descriptor, so the child opens
+    its own handles on first use.
+    """
+    _shared_loaders.clear()
+    _failed_opens.clear()
+
+
+if hasattr(os, "register_at_fork"):  # POSIX only; spawned processes start with an empty registry
+    os.register_at_fork(after_in_child=_forget_shared_loaders)
+
+
+@atexit.register
+def close_shared_loaders():
+    """Close every shared loader; the next `get_shared_loader` call reopens the raster."""
+    _failed_opens.clear()
+    while _shared_loaders:
+        _, loader = _shared_loaders.popitem()
+        loader.close()
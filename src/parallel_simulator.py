@@ -0,0 +1,170 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import config
+from config import WIND_RANDOM_SPREAD
+from data_loader import load_regions
+from instrumentation import Instrumentation
+from ndvi_loader import get_shared_loader
+from region import RegionIndex
+from region_mask import RegionMask
+from risk_raster import RiskRaster
+from weather_field import WeatherField
+from vectorized_simulator import VectorizedFireSimulator, take_columns
+
+PARTITION_MODES = ("region", "tile")
+
+# Per-process state, filled once by the pool initializer
+_worker = {}
+
+
+def region_lookup_kind(region_index):
+    """Lookup kind ("raster" or "polygon") that makes workers rebuild the same kind of `region_index`."""
+    return "raster" if isinstance(region_index, RegionMask) else "polygon"
+
+
+def _init_worker(regions_path, ndvi_path, ndvi_mode, region_lookup, risk_raster_path=None, weather_field_path=None):
+    """
+    Load regions, NDVI, the region lookup and the optional risk raster and weather field once per
+    worker process. `region_lookup` is the `region_lookup_kind` of the parent's region index.
+    """
+    regions = load_regions(regions_path, simplify_tolerance=config.REGION_SIMPLIFY_TOLERANCE, cache=config.REGION_CACHE)
+    ndvi_loader = get_shared_loader(ndvi_path, mode=ndvi_mode)
+    if region_lookup == "raster":
+        region_index = RegionMask.load_or_build(regions, regions_path, ndvi_loader)
+    else:
+        region_index = RegionIndex(regions)
+    risk_raster = RiskRaster.load(risk_raster_path) if risk_raster_path else None
+    weather_field = WeatherField.load(weather_field_path) if weather_field_path else None
+    _worker.update(
+        regions=regions, ndvi_loader=ndvi_loader, region_index=region_index, risk_raster=risk_raster,
+        weather_field=weather_field
+    )
+
+
+def _filter_partition(index, x, y):
+    """
+    Apply the NDVI and region checks of the spread model to one partition of candidates.
+
+    Returns:
+    - (index, ndvi, summary): the `index` values of the burnable candidates, their NDVI and the
+      instrumentation summary of the checks.
+    """
+    sim = VectorizedFireSimulator(
+        _worker["regions"], output=None, region_index=_worker["region_index"],
+        instrumentation=Instrumentation(report=False)
+    )
+    burnable = sim._filter_burnable({"index": index, "x": x, "y": y}, _worker["ndvi_loader"])
+    return burnable["index"], burnable["ndvi"], sim.instrumentation.summary()
+
+
+class ParallelFireSimulator(VectorizedFireSimulator):
+    """
+    Runs the vectorized spread model with its NDVI and region checks spread over several CPU cores.
+
+    The run is step-synchronous. The parent process keeps the single frontier, burned-cell index
+    and random generator, and builds and deduplicates every step's spread candidates as
+    VectorizedFireSimulator does. The candidates are then split into partitions (by the region of
+    their parent point or by square lon/lat tiles), each partition is checked for NDVI and region
+    containment in a ProcessPoolExecutor, and the burnable candidates are merged back in
+    candidate order before the frontier cap and the next step. Spread from every partition thus
+    sees the cells burned by the others, and a given seed produces the same spread as
+    VectorizedFireSimulator for any worker count or partition mode. Spread points are streamed
+    to `output` step by step.
+
+    Parameters:
+    - regions, output, seed, region_index, cell_size_km, max_frontier, output_format: As for
+      VectorizedFireSimulator.
+    - workers: Number of worker processes (None uses all CPU cores).
+    - partition: "region" or "tile".
+    - tile_size: Tile edge in degrees when partition="tile".
+    - regions_path, ndvi_path: Files each worker loads in its initializer.
+    - risk_raster_path: Optional RiskRaster GeoTIFF (see `RiskRaster.save`).
+    - weather_field_path: Optional WeatherField .npz (see `WeatherField.save`).
+    """
+
+    def __init__(self, regions, output, seed=None, region_index=None, cell_size_km=None, max_frontier=None,
+                 output_format="json", workers=None, partition="region", tile_size=5.0,
+                 regions_path=config.ENRICHED_REGIONS_PATH, ndvi_path=config.NDVI_PATH, risk_raster_path=None,
+                 weather_field_path=None):
+        if partition not in PARTITION_MODES:
+            raise ValueError(f"Unknown partition mode '{partition}', expected one of {PARTITION_MODES}")
+        super().__init__(
+            regions, output, seed=seed, region_index=region_index, cell_size_km=cell_size_km,
+            max_frontier=max_frontier, output_format=output_format,
+            risk_raster=RiskRaster.load(risk_raster_path) if risk_raster_path else None,
+            weather_field=WeatherField.load(weather_field_path) if weather_field_path else None
+        )
+        self.workers = workers or os.cpu_count()
+        self.partition = partition
+        self.tile_size = tile_size
+        self.regions_path = regions_path
+        self.ndvi_path = ndvi_path
+        self.pool = None
+
+    def simulate_fire(self, ignition_points, ndvi_loader, steps=10, risk_threshold=0.4, max_distance=0.2):
+        """
+        Simulate fire spread over a series of steps, checking each step's candidates on the workers.
+
+        Parameters are those of FireSimulator.simulate_fire; `ndvi_loader` only provides the load
+        mode here, since every worker opens its own loader.
+        """
+        print(f"Simulating fire on {self.workers} workers...")
+        # Workers only check NDVI and regions; risk and weather are applied in this process
+        init_args = (
+            self.regions_path, self.ndvi_path, getattr(ndvi_loader, "mode", "sample"),
+            region_lookup_kind(self.region_index)
+        )
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=init_args) as pool:
+            self.pool = pool
+            try:
+                super().simulate_fire(ignition_points, ndvi_loader, steps, risk_threshold, max_distance)
+            finally:
+                self.pool = None
+
+    def _spread_candidates(self, frontier, active, max_distance):
+        candidates = super()._spread_candidates(frontier, active, max_distance)
+        if self.partition == "region":
+            with self.instrumentation.timer("partition"):
+                parent_regions = self.region_index.locate(frontier["x"][active], frontier["y"][active])
+                candidates["partition"] = np.repeat(parent_regions, WIND_RANDOM_SPREAD)
+        return candidates
+
+    def _filter_burnable(self, candidates, ndvi_loader):
+        """
+        Run the NDVI and region checks of every candidate partition on the worker pool and keep
+        the burnable candidates in their original order.
+        """
+        with self.instrumentation.timer("partition"):
+            parts = self.partition_candidates(candidates)
+        with self.instrumentation.timer("workers"):
+            futures = [
+                self.pool.submit(_filter_partition, index, candidates["x"][index], candidates["y"][index])
+                for index in parts
+            ]
+            results = [future.result() for future in futures]
+        for _, _, summary in results:
+            self.instrumentation.merge(summary)
+
+        with self.instrumentation.timer("merge"):
+            index = np.concatenate([np.empty(0, dtype=np.int64)] + [index for index, _, _ in results])
+            ndvi = np.concatenate([np.empty(0)] + [ndvi for _, ndvi, _ in results])
+            order = np.argsort(index, kind="stable")
+            burnable = take_columns(candidates, index[order])
+            burnable["ndvi"] = ndvi[order]
+        return burnable
+
+    def partition_candidates(self, candidates):
+        """
+        Split candidate positions into partitions ordered by partition key; positions keep their
+        candidate order within a partition.
+        """
+        if self.partition == "region":
+            keys = candidates["partition"]
+        else:
+            tile_x = np.floor(candidates["x"] / self.tile_size).astype(np.int64)
+            tile_y = np.floor(candidates["y"] / self.tile_size).astype(np.int64)
+            keys = tile_x * 100_000 + tile_y
+        order = np.argsort(keys, kind="stable")
+        _, starts = np.unique(keys[order], return_index=True)
+        return [index for index in np.split(order, starts[1:]) if len(index)]
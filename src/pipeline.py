@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import pickle
+
+# Bump to invalidate every cached stage output after a change in how stages compute them
+CACHE_VERSION = 1
+
+
+class Stage:
+    """
+    One named step of a Pipeline.
+
+    Parameters:
+    - name: Stage name, used on the command line and in cache file names.
+    - func: Callable taking the results of `inputs` (in order) and returning the stage result.
+    - inputs: Names of upstream stages whose results are passed to `func`.
+    - files: Callable returning the input files the result depends on (hashed by content).
+    - params: Callable returning a JSON-serializable dict of parameters the result depends on.
+    - outputs: Callable mapping the result to files it wrote; a cached result is only reused
+      while those files are unchanged since the stage wrote them.
+    - cache: False to always rerun the stage (e.g. cheap stages with large results).
+    """
+    def __init__(self, name, func, inputs=(), files=None, params=None, outputs=None, cache=True):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.files = files or (lambda: [])
+        self.params = params or (lambda: {})
+        self.outputs = outputs or (lambda result: [])
+        self.cache = cache
+
+
+class Pipeline:
+    """
+    Runs stages in order, caching each result on disk under a key derived from the content
+    hashes of its input files, its parameters and the keys of its upstream stages.
+
+    A stage whose key is unchanged is loaded from the cache instead of being recomputed, so
+    changing e.g. simulation parameters only reruns the simulation and what follows it.
+
+    Parameters:
+    - stages: Stage objects in execution order.
+    - cache_dir: Directory of cached results (`<stage>-<key>.pkl`) and file hashes.
+    """
+    def __init__(self, stages, cache_dir):
+        self.stages = list(stages)
+        self.names = [stage.name for stage in self.stages]
+        self.cache_dir = cache_dir
+        self.hashes_path = os.path.join(cache_dir, "file_hashes.json")
+        self.file_hashes = {}
+
+    def run(self, rerun_from=None, until=None, use_cache=True):
+        """
+        Run the pipeline.
+
+        Parameters:
+        - rerun_from: Stage name; it and every later stage are recomputed even when cached.
+        - until: Last stage to run (default: all).
+        - use_cache: False recomputes every stage without reading the cache (results are still
+          written to it).
+
+        Returns:
+        - dict: stage name -> result of every stage that ran.
+        """
+        for name in (rerun_from, until):
+            if name is not None and name not in self.names:
+                raise ValueError(f"Unknown stage '{name}', expected one of {self.names}")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_file_hashes()
+        forced = self.names.index(rerun_from) if rerun_from else len(self.names)
+        last = self.names.index(until) if until else len(self.names) - 1
+
+        results, keys = {}, {}
+        for position, stage in enumerate(self.stages[:last + 1]):
+            keys[stage.name] = self._stage_key(stage, keys)
+            cache_path = os.path.join(self.cache_dir, f"{stage.name}-{keys[stage.name]}.pkl")
+            if stage.cache and use_cache and position < forced and os.path.exists(cache_path):
+                with open(cache_path, "rb") as file:
+                    cached = pickle.load(file)
+                # Output files may since have been overwritten by a run with other parameters
+                if cached["outputs"] == _output_fingerprints(stage.outputs(cached["result"])):
+                    print(f"⏩ Stage '{stage.name}': cached")
+                    results[stage.name] = cached["result"]
+                    continue
+
+            print(f"▶️ Stage '{stage.name}'")
+            result = stage.func(*(results[name] for name in stage.inputs))
+            results[stage.name] = result
+            if stage.cache:
+                cached = {"result": result, "outputs": _output_fingerprints(stage.outputs(result))}
+                tmp_path = cache_path + ".tmp"
+                with open(tmp_path, "wb") as file:
+                    pickle.dump(cached, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+        self._save_file_hashes()
+        return results
+
+    def _stage_key(self, stage, keys):
+        description = {
+            "version": CACHE_VERSION,
+            "stage": stage.name,
+            "inputs": [keys[name] for name in stage.inputs],
+            "files": [self.file_hash(path) for path in stage.files()],
+            "params": stage.params(),
+        }
+        return hashlib.sha1(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def file_hash(self, path):
+        """
+        SHA-1 of a file's content. Hashes are remembered by (path, size, mtime), so unchanged
+        large inputs such as the NDVI raster are only read once.
+        """
+        if path is None or not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        fingerprint = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        if fingerprint not in self.file_hashes:
+            digest = hashlib.sha1()
+            with open(path, "rb") as file:
+                for chunk in iter(lambda: file.read(2**20), b""):
+                    digest.update(chunk)
+            self.file_hashes[fingerprint] = digest.hexdigest()
+        return self.file_hashes[fingerprint]
+
+    def _load_file_hashes(self):
+        if os.path.exists(self.hashes_path):
+            with open(self.hashes_path, encoding="utf-8") as file:
+                self.file_hashes = json.load(file)
+
+    def _save_file_hashes(self):
+        tmp_path = self.hashes_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.file_hashes, file, indent=2)
+        os.replace(tmp_path, self.hashes_path)
+
+
+def _output_fingerprints(paths):
+    """(size, mtime) of each output path, None for missing ones."""
+    fingerprints = {}
+    for path in paths:
+        stat = os.stat(path) if os.path.exists(path) else None
+        fingerprints[path] = None if stat is None else [stat.st_size, stat.st_mtime_ns]
+    return fingerprints
@@ -1,9 +1,14 @@
+import numpy as np
+import shapely
+from shapely import STRtree
 from shapely.geometry import shape
+from shapely.geometry.base import BaseGeometry
 
 class Region:
     def __init__(self, region_id, geometry, temperature=None, humidity=None, wind_speed=None, wind_direction=None):
         self.region_id = region_id
-        self.geometry = shape(geometry)  # Convert GeoJSON to shapely geometry
+        # Convert GeoJSON to shapely geometry; loaders already pass shapely geometries
+        self.geometry = geometry if isinstance(geometry, BaseGeometry) else shape(geometry)
         self.temperature = temperature
         self.humidity = humidity
         self.wind_speed = wind_speed
@@ -14,3 +19,66 @@ class Region:
 
     def __repr__(self):
         return f"Region({self.region_id})"
+
+
+class RegionLookup:
+    """
+    Query methods shared by the region lookups (RegionIndex, RegionMask).
+
+    Subclasses set `regions` and `region_ids` and implement `locate(xs, ys)`, returning the
+    position in `regions` of the region containing each point, or -1 if none does.
+    """
+    def region_ids_at(self, xs, ys):
+        """Return the region id containing each point (None outside all regions)."""
+        position = self.locate(xs, ys)
+        ids = np.full(len(position), None, dtype=object)
+        ids[position >= 0] = self.region_ids[position[position >= 0]]
+        return ids
+
+    def contains_many(self, xs, ys):
+        """Return a boolean mask of points lying inside any region."""
+        return self.locate(xs, ys) >= 0
+
+    def contains(self, point):
+        return bool(self.contains_many([point.x], [point.y])[0])
+
+
+class RegionIndex(RegionLookup):
+    """
+    Spatial index answering "which region contains each of these points" in one call.
+
+    Region geometries are prepared and stored in an STRtree. A query first takes bounding-box
+    candidates from the tree, then runs the vectorized `shapely.contains_xy` predicate on the
+    candidate pairs only.
+
+    Parameters:
+    - regions: List of Region objects, e.g. the output of `load_regions`.
+    """
+    def __init__(self, regions):
+        self.regions = list(regions)
+        self.region_ids = np.array([r.region_id for r in self.regions], dtype=object)
+        self.geometries = np.array([r.geometry for r in self.regions], dtype=object)
+        shapely.prepare(self.geometries)
+        self.tree = STRtree(self.geometries)
+
+    def locate(self, xs, ys):
+        """
+        Return the position in `regions` of the region containing each point, or -1 if none does.
+        A point on a region boundary is not contained, as with `Region.contains`.
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        result = np.full(len(xs), -1, dtype=np.int64)
+        if len(xs) == 0 or not self.regions:
+            return result
+
+        point_idx, region_idx = self.tree.query(shapely.points(xs, ys))
+        hit = shapely.contains_xy(self.geometries[region_idx], xs[point_idx], ys[point_idx])
+        point_idx, region_idx = point_idx[hit], region_idx[hit]
+
+        # Overlapping regions: the first region in list order wins
+        order = np.lexsort((region_idx, point_idx))
+        point_idx, region_idx = point_idx[order], region_idx[order]
+        points, first = np.unique(point_idx, return_index=True)
+        result[points] = region_idx[first]
+        return result
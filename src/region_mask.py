@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import numpy as np
+import shapely
+from rasterio import features
+from ndvi_loader import raster_index
+from region import RegionLookup
+
+
+def default_mask_path(ndvi_path):
+    """Cache file for the region mask, stored next to the NDVI raster."""
+    return os.path.splitext(ndvi_path)[0] + ".regions.npz"
+
+
+def _file_fingerprint(path):
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+class RegionMask(RegionLookup):
+    """
+    Region geometries rasterized onto the NDVI grid.
+
+    Each cell holds the position + 1 of the region whose geometry covers the cell center
+    (0 outside all regions), so "which region contains this point" becomes one indexed array
+    read. Exposes the same query methods as RegionIndex and can replace it in the simulators,
+    trading exact polygon tests for cell resolution.
+
+    Parameters:
+    - regions: List of Region objects, in the order used by `load_regions`.
+    - mask: 2D integer array of region positions + 1.
+    - transform: Affine transform of the grid (the NDVI raster transform).
+    """
+    def __init__(self, regions, mask, transform):
+        self.regions = list(regions)
+        self.region_ids = np.array([r.region_id for r in self.regions], dtype=object)
+        self.mask = mask
+        self.transform = transform
+        self.height, self.width = mask.shape
+
+    @classmethod
+    def rasterize(cls, regions, transform, height, width):
+        """Burn region geometries onto a grid; on overlaps the first region in list order wins."""
+        dtype = np.uint8 if len(regions) < 255 else np.uint16 if len(regions) < 65535 else np.int32
+        mask = np.zeros((height, width), dtype=dtype)
+        if regions:
+            shapes = [(r.geometry, position + 1) for position, r in enumerate(regions)]
+            features.rasterize(reversed(shapes), out=mask, transform=transform)
+        return cls(regions, mask, transform)
+
+    @classmethod
+    def load_or_build(cls, regions, regions_path, ndvi_loader, cache_path=None):
+        """
+        Load the mask from its on-disk cache, rasterizing it again only when the region file,
+        the NDVI raster or the regions (ids or geometries) changed.
+
+        Parameters:
+        - regions: Region objects loaded from `regions_path`.
+        - regions_path: Region GeoJSON the regions were loaded from.
+        - ndvi_loader: NDVILoader whose grid the mask is aligned to.
+        - cache_path: Cache file; defaults to `<ndvi raster>.regions.npz`.
+        """
+        cache_path = cache_path or default_mask_path(ndvi_loader.tif_path)
+        fingerprint = json.dumps({
+            "regions": _file_fingerprint(regions_path),
+            "raster": _file_fingerprint(ndvi_loader.tif_path),
+            "region_ids": [str(r.region_id) for r in regions],
+            # Geometries differ from the file when loaded with a simplification tolerance
+            "geometries": hashlib.sha1(b"".join(shapely.to_wkb([r.geometry for r in regions]))).hexdigest(),
+        })
+
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                if str(cached["fingerprint"]) == fingerprint:
+                    return cls(regions, cached["mask"], ndvi_loader.transform)
+
+        region_mask = cls.rasterize(regions, ndvi_loader.transform, ndvi_loader.height, ndvi_loader.width)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, mask=region_mask.mask, fingerprint=np.array(fingerprint))
+        os.replace(tmp_path, cache_path)
+        return region_mask
+
+    def matches(self, ndvi_loader):
+        """True if the mask shares the NDVI loader's grid, so cell indices can be reused."""
+        return (self.transform == ndvi_loader.transform
+                and (self.height, self.width) == (ndvi_loader.height, ndvi_loader.width))
+
+    def locate_cells(self, rows, cols, inside):
+        """Region position for cells already located on the grid (-1 outside all regions)."""
+        result = np.full(rows.shape, -1, dtype=np.int64)
+        result[inside] = self.mask[rows[inside], cols[inside]].astype(np.int64) - 1
+        return result
+
+    def locate(self, xs, ys):
+        """Return the position in `regions` of the region containing each point, or -1."""
+        return self.locate_cells(*raster_index(self.transform, self.height, self.width, xs, ys))
@@ -0,0 +1,71 @@
+import numpy as np
+import rasterio
+from ignition_point import compute_risk_scores
+from ndvi_loader import raster_index
+
+
+class RiskRaster:
+    """
+    Fire risk score precomputed for every cell of the NDVI grid from gridded weather.
+
+    The simulators read risk for spread points by cell index instead of copying the parent's
+    weather and score, so scoring a whole step of candidates is one indexed array read.
+
+    Parameters:
+    - risk: 2D float array of risk scores on the NDVI grid (NaN where there is no weather).
+    - transform: Affine transform of the grid (the NDVI raster transform).
+    """
+    def __init__(self, risk, transform):
+        self.risk = risk
+        self.transform = transform
+        self.height, self.width = risk.shape
+
+    @classmethod
+    def from_weather_grids(cls, weather, transform):
+        """
+        Score gridded weather in one vectorized pass.
+
+        Parameters:
+        - weather: dict of 2D `temperature`, `humidity` and `wind_speed` arrays on the grid.
+        - transform: Affine transform of the grid.
+        """
+        return cls(compute_risk_scores(weather), transform)
+
+    @classmethod
+    def from_regions(cls, region_mask):
+        """
+        Grid the per-region weather of a RegionMask's regions onto its cells; cells outside all
+        regions or in regions without weather get NaN risk.
+        """
+        weather = {}
+        for name in ("temperature", "humidity", "wind_speed"):
+            values = [np.nan if getattr(r, name) is None else getattr(r, name) for r in region_mask.regions]
+            # Position 0 of the mask means "no region"
+            lookup = np.concatenate([[np.nan], np.asarray(values, dtype=float)])
+            weather[name] = lookup[region_mask.mask]
+        return cls.from_weather_grids(weather, region_mask.transform)
+
+    @classmethod
+    def load(cls, path):
+        """Read a risk raster written by `save`."""
+        with rasterio.open(path) as src:
+            # Scores are stored as float32; round back to the 3 decimals they were computed with
+            return cls(np.round(src.read(1).astype(float), 3), src.transform)
+
+    def save(self, path, ndvi_loader):
+        """Write the risk grid as a float32 GeoTIFF aligned with the NDVI raster (nodata NaN)."""
+        profile = ndvi_loader.dataset.profile.copy()
+        profile.update(dtype="float32", count=1, nodata=np.nan, compress="deflate")
+        with rasterio.open(path, "w", **profile) as dst:
+            dst.write(self.risk.astype(np.float32), 1)
+        print(f"Saved risk raster to {path}")
+
+    def risk_at_cells(self, rows, cols, inside):
+        """Risk for cells already located on the grid (NaN outside it)."""
+        result = np.full(rows.shape, np.nan)
+        result[inside] = self.risk[rows[inside], cols[inside]]
+        return result
+
+    def risk_at(self, xs, ys):
+        """Risk for arrays of WGS84 coordinates (NaN outside the grid or without weather)."""
+        return self.risk_at_cells(*raster_index(self.transform, self.height, self.width, xs, ys))
@@ -0,0 +1,59 @@
+"""
+Benchmark WeatherClient throughput against the local stub server.
+
+    python benchmark_weather_client.py --points 5000 --latency 0.05 --max-in-flight 48 --error-rate 0.01
+
+Compares a fixed concurrency of 10 (the old weather_loader setting) with the adaptive AIMD
+client, both talking to an in-process stub that adds latency, throttles with 429 above a
+concurrency limit and fails a fraction of requests with 503.
+"""
+import argparse
+import asyncio
+import socket
+from aiohttp import web
+from weather_client import WeatherClient
+from weather_stub_server import make_app
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_benchmark(args):
+    port = free_port()
+    app = make_app(args.latency, args.max_in_flight, args.error_rate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    configurations = {
+        "fixed 10": dict(initial_concurrency=10, min_concurrency=10, max_concurrency=10),
+        "aimd": dict(initial_concurrency=10, max_concurrency=args.max_concurrency),
+    }
+    try:
+        for name, settings in configurations.items():
+            client = WeatherClient(
+                f"http://127.0.0.1:{port}/v1", "benchmark", backoff_base=0.05, backoff_max=1.0,
+                report_every=None, **settings
+            )
+            points = ((i, 50 + (i % 100) * 0.1, 80 + (i // 100) * 0.1) for i in range(args.points))
+            results = await client.fetch_many(points, total=args.points)
+            missing = sum(w is None for w in results.values())
+            print(f"📊 {name:>8}: {client.stats['points_per_second']:>7.1f} points/s in "
+                  f"{client.stats['seconds']:.1f}s, {client.stats['requests']} requests, "
+                  f"{client.stats['throttled']} throttled, {client.stats['retries']} retries, "
+                  f"{missing} failed, final concurrency {client.stats['final_concurrency']}")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark WeatherClient against a local stub server")
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub seconds per request")
+    parser.add_argument("--max-in-flight", type=int, default=48, help="stub answers 429 above this concurrency")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="stub fraction of 503 answers")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="AIMD client upper bound")
+    asyncio.run(run_benchmark(parser.parse_args()))
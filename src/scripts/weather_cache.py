@@ -0,0 +1,81 @@
+import sqlite3
+import time
+import numpy as np
+
+WEATHER_FIELDS = ["temperature", "humidity", "wind_speed", "wind_direction"]
+
+
+def grid_keys(lats, lons, grid_deg):
+    """Snap coordinates to a grid of `grid_deg` degrees; returns integer (lat, lon) cell keys."""
+    lat_keys = np.round(np.asarray(lats, dtype=float) / grid_deg).astype(np.int64)
+    lon_keys = np.round(np.asarray(lons, dtype=float) / grid_deg).astype(np.int64)
+    return lat_keys, lon_keys
+
+
+class WeatherCache:
+    """
+    On-disk SQLite cache of current weather per grid cell.
+
+    Rows are keyed by grid size and (lat, lon) cell and hold the time the weather was fetched.
+    A cached answer is reused until it is `ttl_hours` old, so a re-run within that time only
+    fetches cells it has not seen; older rows are never returned and are purged when the cache
+    is opened.
+
+    Parameters:
+    - path: SQLite database file (created if missing).
+    - grid_deg: Grid cell size in degrees the keys were computed with.
+    - ttl_hours: Maximum age of a cached answer.
+    """
+    def __init__(self, path, grid_deg, ttl_hours=6):
+        self.path = path
+        self.grid = int(round(grid_deg * 1e6))
+        self.ttl_seconds = ttl_hours * 3600
+        self.connection = sqlite3.connect(path)
+        # Drop caches of the older layout, which also keyed rows by an hourly time bucket
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(weather)")]
+        if "bucket" in columns:
+            self.connection.execute("DROP TABLE weather")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS weather ("
+            " grid INTEGER, lat_key INTEGER, lon_key INTEGER, fetched_at REAL,"
+            " temperature REAL, humidity REAL, wind_speed REAL, wind_direction REAL,"
+            " PRIMARY KEY (grid, lat_key, lon_key))"
+        )
+        self.connection.execute("DELETE FROM weather WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+        self.connection.commit()
+
+    def get_many(self, keys):
+        """
+        Look up cached weather for (lat_key, lon_key) cells.
+
+        Returns:
+        - dict: cell key -> weather dict, for the cells fetched less than `ttl_hours` ago.
+        """
+        rows = self.connection.execute(
+            "SELECT lat_key, lon_key, temperature, humidity, wind_speed, wind_direction FROM weather"
+            " WHERE grid = ? AND fetched_at >= ?",
+            (self.grid, time.time() - self.ttl_seconds)
+        )
+        cached = {(lat_key, lon_key): dict(zip(WEATHER_FIELDS, values)) for lat_key, lon_key, *values in rows}
+        return {key: cached[key] for key in keys if key in cached}
+
+    def put_many(self, weather_by_key):
+        """Store weather dicts keyed by (lat_key, lon_key) cell, replacing older answers."""
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO weather VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (self.grid, lat_key, lon_key, now, *(weather[name] for name in WEATHER_FIELDS))
+                for (lat_key, lon_key), weather in weather_by_key.items()
+            ]
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,216 @@
+import asyncio
+import random
+import time
+import aiohttp
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit adjusted by additive increase / multiplicative decrease.
+
+    Every successful request grows the limit by `increase / limit` (about +`increase` per round
+    trip of the whole window); a throttled or failed request multiplies it by `decrease`. Like TCP
+    congestion control, only requests started after the last decrease can trigger another one,
+    so a burst of errors from one window backs off once.
+    """
+    def __init__(self, initial=10, minimum=1, maximum=64, increase=1.0, decrease=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self.last_decrease = float("-inf")
+        self.condition = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait for a free slot; returns the start time to pass to `on_throttle`."""
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return time.monotonic()
+
+    async def release(self):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def on_success(self):
+        self.limit = min(self.limit + self.increase / self.limit, self.maximum)
+
+    def on_throttle(self, started):
+        if started >= self.last_decrease:
+            self.limit = max(self.limit * self.decrease, self.minimum)
+            self.last_decrease = time.monotonic()
+
+
+class WeatherClient:
+    """
+    Async WeatherAPI `current.json` client for enriching large point sets.
+
+    Points are streamed through a bounded queue to a fixed pool of workers, so memory does not
+    grow with the number of points. In-flight requests are capped by an AIMD limiter that backs
+    off on 429/5xx and timeouts. Failed requests, including 200 responses with a malformed body,
+    are retried with exponential backoff and full jitter (honouring Retry-After). HTTP connections
+    are pooled and kept alive.
+
+    Parameters:
+    - base_url: API root, e.g. "http://api.weatherapi.com/v1".
+    - api_key: WeatherAPI key.
+    - connection_limit, connection_limit_per_host, keepalive_timeout: TCPConnector settings.
+    - initial_concurrency, min_concurrency, max_concurrency: AIMD limiter bounds.
+    - max_retries: Retries per point after the first attempt.
+    - backoff_base, backoff_max: Retry delays are drawn uniformly from
+      [0, min(backoff_max, backoff_base * 2**attempt)]; a Retry-After delay is capped at backoff_max.
+    - timeout: Total timeout of a request in seconds.
+    - queue_size: Points buffered ahead of the workers.
+    - report_every: Seconds between throughput reports (None disables them).
+    """
+    def __init__(self, base_url, api_key, connection_limit=100, connection_limit_per_host=0, keepalive_timeout=30,
+                 initial_concurrency=10, min_concurrency=1, max_concurrency=64, max_retries=5, backoff_base=0.5,
+                 backoff_max=30.0, timeout=10.0, queue_size=1000, report_every=10.0):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self.report_every = report_every
+        self.stats = {}
+
+    async def fetch_many(self, points, total=None):
+        """
+        Fetch current weather for `(key, lat, lon)` tuples.
+
+        Parameters:
+        - points: Iterable of (key, lat, lon); consumed lazily.
+        - total: Number of points, for progress reports only.
+
+        Returns:
+        - dict: key -> weather dict (temperature, humidity, wind_speed in m/s, wind_direction),
+          or None for points that still failed after all retries.
+        """
+        self.limiter = AIMDLimiter(self.initial_concurrency, self.min_concurrency, self.max_concurrency)
+        self.stats = {"requests": 0, "succeeded": 0, "failed": 0, "retries": 0, "throttled": 0}
+        self.total = total
+        self.started = time.monotonic()
+        results = {}
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit, limit_per_host=self.connection_limit_per_host,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            workers = [asyncio.create_task(self._worker(session, queue, results)) for _ in range(self.max_concurrency)]
+            reporter = asyncio.create_task(self._report_loop()) if self.report_every else None
+            try:
+                for point in points:
+                    await queue.put(point)
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers + ([reporter] if reporter else []):
+                    task.cancel()
+        self.stats["seconds"] = round(time.monotonic() - self.started, 3)
+        self.stats["points_per_second"] = round(len(results) / max(self.stats["seconds"], 1e-9), 1)
+        self.stats["final_concurrency"] = round(self.limiter.limit, 1)
+        return results
+
+    async def _worker(self, session, queue, results):
+        while True:
+            point = await queue.get()
+            if point is None:
+                return
+            key, lat, lon = point
+            results[key] = await self._fetch(session, lat, lon)
+
+    async def _fetch(self, session, lat, lon):
+        url = f"{self.base_url}/current.json"
+        params = {"key": self.api_key, "q": f"{lat},{lon}", "aqi": "no"}
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+            retry_after = None
+            started = await self.limiter.acquire()
+            try:
+                self.stats["requests"] += 1
+                async with session.get(url, params=params) as resp:
+                    if resp.status == 200:
+                        try:
+                            weather = parse_current(await resp.json())
+                        except (ValueError, TypeError) as e:
+                            # Truncated or garbled body: retried like a failed request
+                            error = f"Malformed response: {e!r}"
+                        else:
+                            self.limiter.on_success()
+                            self.stats["succeeded"] += 1
+                            return weather
+                    else:
+                        error = f"Status {resp.status}"
+                        if resp.status not in RETRY_STATUSES:
+                            break
+                        if resp.status == 429:
+                            self.stats["throttled"] += 1
+                        retry_after = resp.headers.get("Retry-After")
+                        self.limiter.on_throttle(started)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = repr(e)
+                self.limiter.on_throttle(started)
+            finally:
+                await self.limiter.release()
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+        print(f"⚠️ Failed to fetch weather for ({lat:.4f}, {lon:.4f}): {error}")
+        self.stats["failed"] += 1
+        return None
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(self.report_every)
+            print(f"🔁 {self.progress()}")
+
+    def progress(self):
+        done = self.stats["succeeded"] + self.stats["failed"]
+        elapsed = time.monotonic() - self.started
+        of_total = f"/{self.total}" if self.total is not None else ""
+        return (
+            f"Processed {done}{of_total} points, {done / max(elapsed, 1e-9):.1f} points/s, "
+            f"concurrency {self.limiter.limit:.1f}, {self.stats['retries']} retries, "
+            f"{self.stats['throttled']} throttled"
+        )
+
+
+def parse_current(data):
+    """
+    Extract the weather fields used by the simulator from a `current.json` response.
+    Raises ValueError if the response does not have the expected structure.
+    """
+    current = data.get("current", {}) if isinstance(data, dict) else None
+    if not isinstance(current, dict):
+        raise ValueError(f"Unexpected current.json response: {str(data)[:100]}")
+    return {
+        "temperature": current.get("temp_c", 20.0),
+        "humidity": current.get("humidity", 50.0),
+        "wind_speed": round(current.get("wind_kph", 2.0) / 3.6, 2),
+        "wind_direction": current.get("wind_degree", 0.0),
+    }
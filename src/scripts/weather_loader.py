@@ -1,111 +1,170 @@
-import aiohttp
 import asyncio
+import os
+import sys
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from weather_cache import WeatherCache, grid_keys
+from weather_client import WeatherClient
+from weather_field import WeatherField
 
 # File paths
 IGNITION_PATH = "../../data/MODIS_C6_1_Russia_Asia_7d.shp"
 OUTPUT_PATH = "../../data/ignition_with_weather.geojson"
 FALLBACK_CSV = "../outputs/fallback_weather_points.csv"
+CACHE_PATH = "../../data/weather_cache.sqlite"
+REGIONS_PATH = "../../data/siberia_regions_with_weather.geojson"
+FIELD_PATH = "../../data/weather_field.npz"
 
 # API Setup
 load_dotenv()
 WEATHERAPI_KEY = os.getenv("WEATHERAPI_KEY")
-API_TEMPLATE = (
-    "http://api.weatherapi.com/v1/current.json"
-    "?key={key}&q={lat},{lon}&aqi=no"
-)
-
-MAX_CONCURRENT = 10
-semaphore = asyncio.Semaphore(MAX_CONCURRENT)
-
-success_count = 0
-fail_count = 0
-fallback_points = []
-
-async def fetch_weather(session, lat, lon, index, total):
-    global success_count, fail_count
-
-    async with semaphore:
-        url = API_TEMPLATE.format(key=WEATHERAPI_KEY, lat=lat, lon=lon)
-
-        for attempt in range(2):  # try twice
-            try:
-                async with session.get(url, timeout=10) as resp:
-                    if resp.status == 502 and attempt == 0:
-                        await asyncio.sleep(1)
-                        continue  # retry once
-
-                    if resp.status != 200:
-                        raise Exception(f"Status {resp.status}")
-
-                    data = await resp.json()
-                    current = data.get("current", {})
-
-                    temperature = current.get("temp_c", 20.0)
-                    humidity = current.get("humidity", 50.0)
-                    wind_speed = round(current.get("wind_kph", 2.0) / 3.6, 2)
-                    wind_direction = current.get("wind_degree", 0.0)
-                    if index % 250 == 0 or index == total - 1:
-                        print(f"🔁 Processed {index + 1}/{total} points...")
-                    success_count += 1
-                    return {
-                        "temperature": temperature,
-                        "humidity": humidity,
-                        "wind_speed": wind_speed,
-                        "wind_direction": wind_direction
-                    }
-
-            except Exception as e:
-                if attempt == 1:  # only report failure after final try
-                    print(f"⚠️ Failed to fetch weather for ({lat:.4f}, {lon:.4f}): {e}")
-                    fail_count += 1
-                    fallback_points.append((lat, lon))
-                    return {
-                        "temperature": 20.0,
-                        "humidity": 50.0,
-                        "wind_speed": 2.0,
-                        "wind_direction": 0.0
-                    }
-
-async def enrich_points(gdf):
-    total = len(gdf)
-    async with aiohttp.ClientSession() as session:
-        tasks = [
-            fetch_weather(session, row.geometry.y, row.geometry.x, idx, total)
-            for idx, row in gdf.iterrows()
-        ]
-        return await asyncio.gather(*tasks)
-
-# 🔥 Load ignition points
-print("🔥 Loading ignition points...")
-gdf = gpd.read_file(IGNITION_PATH).to_crs(epsg=4326)
-print(f"✅ Loaded {len(gdf)} ignition points")
-
-# 🌦️ Enrich with weather
-print("🌦️ Fetching weather for ignition points...")
-weather_data = asyncio.run(enrich_points(gdf))
-
-# 🔗 Attach to GeoDataFrame
-gdf["temperature"] = [w["temperature"] for w in weather_data]
-gdf["humidity"] = [w["humidity"] for w in weather_data]
-gdf["wind_speed"] = [w["wind_speed"] for w in weather_data]
-gdf["wind_direction"] = [w["wind_direction"] for w in weather_data]
-print("🌬️ Wind speeds:")
-for w in weather_data:
-    print(w["wind_speed"])
-# 💾 Save enriched GeoJSON
-gdf.to_file(OUTPUT_PATH, driver="GeoJSON")
-print(f"✅ Saved enriched ignition points to {OUTPUT_PATH}")
-
-# 💾 Save fallback points
-fallback_df = pd.DataFrame(fallback_points, columns=["latitude", "longitude"])
-fallback_df.to_csv(FALLBACK_CSV, index=False)
-print(f"⚠️ Saved fallback points to {FALLBACK_CSV}")
-
-# 📊 Final Report
-print(f"✅ Successes: {success_count}")
-print(f"❌ Failures: {fail_count}")
-print(f"⚠️ Fallback points: {len(fallback_points)}")
+# Point at another server (e.g. weather_stub_server.py) to run offline
+WEATHERAPI_BASE_URL = os.getenv("WEATHERAPI_BASE_URL", "http://api.weatherapi.com/v1")
+
+# Points are snapped to a grid of this many degrees (0.01° ≈ 1 km) and fetched once per cell;
+# answers are cached on disk and reused for CACHE_TTL_HOURS
+GRID_DEG = float(os.getenv("WEATHER_GRID_DEG", "0.01"))
+CACHE_TTL_HOURS = 6
+
+# "points" fetches weather per grid cell holding detections; "grid" fetches a coarse weather field
+# of FIELD_STEP_DEG covering the Siberian regions, saves it to FIELD_PATH for the simulator and
+# interpolates it to the detections, so API calls scale with the grid size instead
+WEATHER_MODE = os.getenv("WEATHER_MODE", "points")
+FIELD_STEP_DEG = float(os.getenv("WEATHER_FIELD_STEP_DEG", "1.0"))
+
+FALLBACK_WEATHER = {
+    "temperature": 20.0,
+    "humidity": 50.0,
+    "wind_speed": 2.0,
+    "wind_direction": 0.0
+}
+
+# Connection pool and adaptive concurrency of the API client (see WeatherClient)
+CONNECTION_LIMIT = int(os.getenv("WEATHER_CONNECTION_LIMIT", "100"))
+INITIAL_CONCURRENCY = int(os.getenv("WEATHER_INITIAL_CONCURRENCY", "10"))
+MAX_CONCURRENCY = int(os.getenv("WEATHER_MAX_CONCURRENCY", "64"))
+MAX_RETRIES = int(os.getenv("WEATHER_MAX_RETRIES", "5"))
+
+def make_client():
+    """WeatherClient for WEATHERAPI_BASE_URL with the connection and concurrency settings above."""
+    return WeatherClient(
+        WEATHERAPI_BASE_URL, WEATHERAPI_KEY, connection_limit=CONNECTION_LIMIT,
+        initial_concurrency=INITIAL_CONCURRENCY, max_concurrency=MAX_CONCURRENCY, max_retries=MAX_RETRIES
+    )
+
+async def fetch_cells(client, cell_keys, grid_deg, cache, fallback_points=None):
+    """
+    Fetch weather at the centers of (lat_key, lon_key) grid cells, reusing cached cells.
+
+    Parameters:
+    - client: WeatherClient used for cells missing from the cache.
+    - cell_keys: (lat_key, lon_key) cells on a `grid_deg` grid.
+    - cache: WeatherCache for the same grid.
+    - fallback_points: Optional list receiving the (lat, lon) centers of cells that failed.
+
+    Returns:
+    - dict: cell key -> weather dict (FALLBACK_WEATHER for cells that failed).
+    """
+    weather = cache.get_many(cell_keys)
+    missing = [key for key in cell_keys if key not in weather]
+    print(f"🧮 {len(cell_keys)} grid cells: {len(weather)} cached, {len(missing)} to fetch")
+
+    points = ((key, round(key[0] * grid_deg, 6), round(key[1] * grid_deg, 6)) for key in missing)
+    fetched = await client.fetch_many(points, total=len(missing))
+    print(f"📈 {client.progress()}")
+    # Failed cells are not cached, so the next run retries them
+    if fallback_points is not None:
+        fallback_points.extend((round(key[0] * grid_deg, 6), round(key[1] * grid_deg, 6))
+                               for key, w in fetched.items() if w is None)
+    fetched = {key: w for key, w in fetched.items() if w is not None}
+    cache.put_many(fetched)
+    weather.update(fetched)
+    return {key: weather.get(key, FALLBACK_WEATHER) for key in cell_keys}
+
+async def enrich_points(client, gdf, cache, fallback_points=None):
+    """
+    Fetch weather once per grid cell holding points and fan the results back out to every point.
+    `client`, `cache` and `fallback_points` are passed on to `fetch_cells`.
+
+    Returns:
+    - dict: weather column name -> list of values, one per point.
+    """
+    lat_keys, lon_keys = grid_keys(gdf.geometry.y.to_numpy(), gdf.geometry.x.to_numpy(), GRID_DEG)
+    cells, point_cell = np.unique(np.column_stack([lat_keys, lon_keys]), axis=0, return_inverse=True)
+    cell_keys = [tuple(cell) for cell in cells.tolist()]
+    print(f"📍 {len(gdf)} points fall in {len(cell_keys)} grid cells")
+    weather = await fetch_cells(client, cell_keys, GRID_DEG, cache, fallback_points)
+    point_weather = [weather[cell_keys[cell]] for cell in point_cell.ravel()]
+    return {name: [w[name] for w in point_weather] for name in FALLBACK_WEATHER}
+
+async def fetch_field(client, bounds, cache, fallback_points=None):
+    """
+    Fetch weather on a FIELD_STEP_DEG grid of nodes covering `bounds` (minx, miny, maxx, maxy).
+    `client`, `cache` and `fallback_points` are passed on to `fetch_cells`.
+
+    Returns:
+    - WeatherField over the grid nodes.
+    """
+    minx, miny, maxx, maxy = bounds
+    lat_keys = np.arange(np.floor(miny / FIELD_STEP_DEG), np.ceil(maxy / FIELD_STEP_DEG) + 1).astype(int)
+    lon_keys = np.arange(np.floor(minx / FIELD_STEP_DEG), np.ceil(maxx / FIELD_STEP_DEG) + 1).astype(int)
+    node_keys = [(lat_key, lon_key) for lat_key in lat_keys.tolist() for lon_key in lon_keys.tolist()]
+    print(f"🗺️ Weather field of {len(lat_keys)}x{len(lon_keys)} nodes every {FIELD_STEP_DEG}°")
+    weather = await fetch_cells(client, node_keys, FIELD_STEP_DEG, cache, fallback_points)
+    grids = {
+        name: np.array([weather[key][name] for key in node_keys], dtype=float).reshape(len(lat_keys), len(lon_keys))
+        for name in FALLBACK_WEATHER
+    }
+    return WeatherField(lat_keys * FIELD_STEP_DEG, lon_keys * FIELD_STEP_DEG, grids)
+
+def main():
+    """Enrich the ignition points with weather; saves them, the fallback points and (grid mode) the field."""
+    client = make_client()
+    fallback_points = []
+
+    # 🔥 Load ignition points
+    print("🔥 Loading ignition points...")
+    gdf = gpd.read_file(IGNITION_PATH).to_crs(epsg=4326)
+    print(f"✅ Loaded {len(gdf)} ignition points")
+
+    # 🌦️ Enrich with weather
+    if WEATHER_MODE == "grid":
+        print("🌦️ Fetching gridded weather over the Siberian regions...")
+        bounds = gpd.read_file(REGIONS_PATH).to_crs(epsg=4326).total_bounds
+        with WeatherCache(CACHE_PATH, FIELD_STEP_DEG, CACHE_TTL_HOURS) as cache:
+            field = asyncio.run(fetch_field(client, bounds, cache, fallback_points))
+        field.save(FIELD_PATH)
+        print(f"✅ Saved weather field to {FIELD_PATH}")
+        weather_data = field.interpolate(gdf.geometry.x.to_numpy(), gdf.geometry.y.to_numpy())
+        weather_data = {name: np.round(values, 2) for name, values in weather_data.items()}
+    else:
+        print("🌦️ Fetching weather for ignition points...")
+        with WeatherCache(CACHE_PATH, GRID_DEG, CACHE_TTL_HOURS) as cache:
+            weather_data = asyncio.run(enrich_points(client, gdf, cache, fallback_points))
+
+    # 🔗 Attach to GeoDataFrame
+    for name, values in weather_data.items():
+        gdf[name] = values
+    wind_speed = np.asarray(weather_data["wind_speed"], dtype=float)
+    print(f"🌬️ Wind speed: mean {wind_speed.mean():.2f} m/s, max {wind_speed.max():.2f} m/s")
+    # 💾 Save enriched GeoJSON
+    gdf.to_file(OUTPUT_PATH, driver="GeoJSON")
+    print(f"✅ Saved enriched ignition points to {OUTPUT_PATH}")
+
+    # 💾 Save fallback points
+    fallback_df = pd.DataFrame(fallback_points, columns=["latitude", "longitude"])
+    fallback_df.to_csv(FALLBACK_CSV, index=False)
+    print(f"⚠️ Saved fallback points to {FALLBACK_CSV}")
+
+    # 📊 Final Report
+    print(f"✅ Successes: {client.stats.get('succeeded', 0)}")
+    print(f"❌ Failures: {client.stats.get('failed', 0)}")
+    print(f"⚠️ Fallback points: {len(fallback_points)}")
+
+
+if __name__ == "__main__":
+    main()
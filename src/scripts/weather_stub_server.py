@@ -0,0 +1,81 @@
+"""
+Local stand-in for the WeatherAPI `current.json` endpoint, for running weather_loader.py offline.
+
+    python weather_stub_server.py --port 8765
+    WEATHERAPI_BASE_URL=http://127.0.0.1:8765/v1 python weather_loader.py
+
+Answers are deterministic functions of the requested coordinates, so repeated runs are
+comparable. Latency, a concurrency limit answered with 429 and random 503 errors can be
+simulated to exercise the client's backoff. The number of requests served is printed on every
+1000th request and on exit.
+"""
+import argparse
+import asyncio
+import math
+import random
+from aiohttp import web
+
+
+def current_weather_payload(lat, lon):
+    return {
+        "location": {"lat": lat, "lon": lon},
+        "current": {
+            "temp_c": round(25 + 10 * math.sin(math.radians(lon * 7)), 1),
+            "humidity": int(40 + 20 * math.cos(math.radians(lat * 11))),
+            "wind_kph": round(10 + 8 * math.sin(math.radians(lat * 5 + lon * 3)), 1),
+            "wind_degree": int((lat * 37 + lon * 53) % 360),
+        },
+    }
+
+
+def make_app(latency=0.0, max_in_flight=None, error_rate=0.0, seed=0):
+    """
+    Build the stub application.
+
+    Parameters:
+    - latency: Seconds each request takes.
+    - max_in_flight: Requests beyond this many concurrent ones get 429 (None = unlimited).
+    - error_rate: Fraction of requests answered with 503.
+    - seed: Seed of the error sampling.
+    """
+    rng = random.Random(seed)
+    state = {"in_flight": 0, "served": 0, "throttled": 0, "errors": 0}
+
+    async def current_weather(request):
+        state["served"] += 1
+        if state["served"] % 1000 == 0:
+            print(f"🔁 Served {state['served']} requests")
+        if max_in_flight is not None and state["in_flight"] >= max_in_flight:
+            state["throttled"] += 1
+            return web.json_response({"error": {"message": "rate limited"}}, status=429)
+        state["in_flight"] += 1
+        try:
+            if latency:
+                await asyncio.sleep(latency)
+            if rng.random() < error_rate:
+                state["errors"] += 1
+                return web.json_response({"error": {"message": "unavailable"}}, status=503)
+            lat, lon = (float(value) for value in request.query["q"].split(","))
+            return web.json_response(current_weather_payload(lat, lon))
+        finally:
+            state["in_flight"] -= 1
+
+    app = web.Application()
+    app["state"] = state
+    app.router.add_get("/v1/current.json", current_weather)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve stub WeatherAPI responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="answer 429 above this concurrency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 answers")
+    args = parser.parse_args()
+    app = make_app(args.latency, args.max_in_flight, args.error_rate)
+    try:
+        web.run_app(app, host=args.host, port=args.port)
+    finally:
+        print(f"✅ Served {app['state']['served']} requests")
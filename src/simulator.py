@@ -1,18 +1,26 @@
 import json
 import math
 import random
+import numpy as np
 from config import WIND_RANDOM_SPREAD
+from instrumentation import Instrumentation
+from region import RegionIndex
+from spread_writer import SPREAD_COLUMNS, write_spread
 
 class FireSimulator:
     """
     Simulates the spread of wildfire based on ignition points and weather conditions.
     """
 
-    def __init__(self, regions, output):
+    def __init__(self, regions, output, region_index=None, output_format="json", instrumentation=None):
         self.regions = regions
+        self.region_index = region_index if region_index is not None else RegionIndex(regions)
         self.ignition_points = []
         self.spread_points = []
         self.output = output
+        self.output_format = output_format
+        self.output_path = None
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
 
     def simulate_fire(self, ignition_points, ndvi_loader, steps=10, risk_threshold=0.4, max_distance=0.2):
         """
@@ -24,7 +32,11 @@ class FireSimulator:
         - steps: Number of simulation steps to run.
         - risk_threshold: Minimum risk score required for fire to spread.
         - max_distance: Base distance a fire can travel in one step (adjusted by wind).
+
+        Per-step counters (candidates, NDVI lookups and rejects, region rejects, dedup hits) and
+        throttled progress go to `instrumentation`.
         """
+        instrumentation = self.instrumentation
         self.ignition_points = ignition_points
         self.spread_points = []
         burning_points = ignition_points.copy()
@@ -32,13 +44,17 @@ class FireSimulator:
         print("Simulating fire...", end='')
         for step in range(1, steps + 1):
             print(f"\n🔥 Step {step}")
+            instrumentation.start_step(step)
             new_spreads = []
             counter = 0
+            # Counted in locals and added once per step to keep the inner loop cheap
+            candidates = ndvi_rejects = region_rejects = dedup_hits = 0
             for pt in burning_points:
                 counter += 1
-                print(f'\rPoints done: {counter}/{len(burning_points)}', flush=True, end='')
+                instrumentation.progress("Points done", done=counter, total=len(burning_points))
                 pt_key = (round(pt.x, 4), round(pt.y, 4))
                 if pt_key in burned_points:
+                    dedup_hits += 1
                     continue
                 burned_points.add(pt_key)
 
@@ -70,22 +86,33 @@ class FireSimulator:
                     new_x = pt.x + dx
                     new_y = pt.y + dy
 
+                    # Check NDVI before building the point so rejected candidates cost no object
+                    candidates += 1
+                    ndvi = ndvi_loader.get_ndvi(new_x, new_y)
+                    if ndvi is None or ndvi < 0.15:
+                        ndvi_rejects += 1
+                        continue
+
                     new_pt = type(pt)(
                         new_x, new_y,
                         pt.temperature, pt.humidity,
-                        pt.wind_speed, pt.wind_direction
+                        pt.wind_speed, pt.wind_direction,
+                        ndvi=ndvi
                     )
 
-                    # Check NDVI
-                    new_pt.ndvi = ndvi_loader.get_ndvi(new_x, new_y)
-                    if new_pt.ndvi is None or new_pt.ndvi < 0.15:
-                        continue
-
                     # Avoid duplicates and ensure the point lies in a valid region
                     new_pt_key = (round(new_x, 4), round(new_y, 4))
-                    if new_pt_key not in burned_points and any(r.contains(new_pt.to_point()) for r in self.regions):
+                    if new_pt_key in burned_points:
+                        dedup_hits += 1
+                    elif not self.region_index.contains(new_pt.to_point()):
+                        region_rejects += 1
+                    else:
                         new_spreads.append(new_pt)
 
+            for name, value in [("candidates", candidates), ("ndvi_lookups", candidates), ("ndvi_rejects", ndvi_rejects),
+                                ("region_rejects", region_rejects), ("dedup_hits", dedup_hits)]:
+                instrumentation.count(name, value)
+            instrumentation.end_step(frontier=len(burning_points), spread=len(new_spreads))
 
             if not new_spreads:
                 print("\nNo further spread.")
@@ -93,7 +120,27 @@ class FireSimulator:
 
             self.spread_points.extend(new_spreads)
             burning_points = new_spreads
-        self.save_spread_to_json()
+        with instrumentation.timer("write"):
+            self.save_spread()
+
+    def save_spread(self):
+        """
+        Save spread points in `output_format` ("json", "parquet", "arrow" or "npz"). JSON goes to
+        `output` as before; other formats replace its suffix. The written path is `output_path`.
+        """
+        if self.output_format == "json":
+            self.save_spread_to_json()
+            self.output_path = self.output
+            return
+        self.output_path = write_spread(self.spread_to_columns(), self.output, self.output_format)
+        print(f"\nSaved fire spread results to {self.output_path}")
+
+    def spread_to_columns(self):
+        """Spread points as a dict of column arrays keyed by SPREAD_COLUMNS (None becomes NaN)."""
+        return {
+            name: np.array([getattr(pt, name, None) for pt in self.spread_points], dtype=float)
+            for name in SPREAD_COLUMNS
+        }
 
     def save_spread_to_json(self):
         """
@@ -1,7 +1,9 @@
+import os
 import geopandas as gpd
+import numpy as np
 import pandas as pd
-from shapely.geometry import Point
 import json
+from spread_writer import SPREAD_COLUMNS, list_spread_parts, pa, pq
 
 def load_spread_points_from_json(json_path):
     """
@@ -16,7 +18,60 @@ def load_spread_points_from_json(json_path):
     with open(json_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    df = pd.DataFrame(data)
-    df["geometry"] = df.apply(lambda row: Point(row["x"], row["y"]), axis=1)
-    gdf = gpd.GeoDataFrame(df, geometry="geometry", crs="EPSG:4326")
-    return gdf
+    # A run without spread writes []: keep the columns so they can still be selected
+    df = pd.DataFrame(data) if data else pd.DataFrame(columns=SPREAD_COLUMNS)
+    return _to_geodataframe(df)
+
+
+def load_spread_points(path, columns=None):
+    """
+    Load fire spread points written in any spread output format into a GeoDataFrame.
+
+    Parameters:
+    - path (str): .json, .parquet, .arrow or .npz file written by the simulator, or a directory
+      of part files written by a streaming run.
+    - columns (list): Columns to read (x and y are always read); None reads all of them.
+
+    Returns:
+    - GeoDataFrame: the requested columns plus a point 'geometry' column in EPSG:4326.
+    """
+    suffix = os.path.splitext(path)[1]
+    if suffix == ".json":
+        gdf = load_spread_points_from_json(path)
+        return gdf if columns is None else gdf[_with_xy(columns) + ["geometry"]]
+
+    names = SPREAD_COLUMNS if columns is None else _with_xy(columns)
+    if os.path.isdir(path):
+        # Streamed output: one part file per step batch
+        parts = [_read_columns(part, names) for part in list_spread_parts(path)]
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=names)
+    else:
+        df = _read_columns(path, names)
+    return _to_geodataframe(df)
+
+
+def _read_columns(path, names):
+    """Read the named columns of a single .parquet, .arrow or .npz spread file into a DataFrame."""
+    suffix = os.path.splitext(path)[1]
+    if suffix == ".npz":
+        with np.load(path) as data:
+            df = pd.DataFrame({name: data[name] for name in names if name in data.files})
+    elif pa is None:
+        raise ImportError(f"pyarrow is required to read {path}")
+    elif suffix == ".parquet":
+        df = pq.read_table(path, columns=names).to_pandas()
+    elif suffix == ".arrow":
+        with pa.memory_map(path) as source:
+            df = pa.ipc.open_file(source).read_all().select(names).to_pandas()
+    else:
+        raise ValueError(f"Unknown spread file type: {path}")
+    return df
+
+
+def _with_xy(columns):
+    return ["x", "y"] + [name for name in columns if name not in ("x", "y")]
+
+
+def _to_geodataframe(df):
+    geometry = gpd.points_from_xy(df["x"], df["y"]) if len(df) else gpd.GeoSeries([])
+    return gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
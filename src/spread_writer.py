@@ -0,0 +1,174 @@
+import glob
+import json
+import os
+import textwrap
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: Parquet/Arrow output falls back to .npz
+    pa = None
+    pq = None
+
+SPREAD_COLUMNS = ["x", "y", "temperature", "humidity", "wind_speed", "wind_direction", "step", "ndvi", "risk_score"]
+
+SPREAD_FORMATS = {"json": ".json", "parquet": ".parquet", "arrow": ".arrow", "npz": ".npz"}
+
+
+def resolve_spread_format(output_format):
+    """Validate an output format, falling back to "npz" when pyarrow is not installed."""
+    if output_format not in SPREAD_FORMATS:
+        raise ValueError(f"Unknown spread output format '{output_format}', expected one of {list(SPREAD_FORMATS)}")
+    if output_format in ("parquet", "arrow") and pa is None:
+        print(f"⚠️ pyarrow is not installed, writing spread points as .npz instead of {output_format}")
+        return "npz"
+    return output_format
+
+
+def spread_output_path(path, output_format):
+    """Replace the suffix of `path` with the one of the output format."""
+    return os.path.splitext(path)[0] + SPREAD_FORMATS[output_format]
+
+
+def write_spread(columns, path, output_format):
+    """
+    Write spread point columns to disk.
+
+    Parameters:
+    - columns: dict of 1D arrays keyed by SPREAD_COLUMNS.
+    - path: Output path; its suffix is replaced to match the format.
+    - output_format: "json", "parquet", "arrow" or "npz".
+
+    Returns:
+    - str: Path of the written file.
+    """
+    output_format = resolve_spread_format(output_format)
+    path = spread_output_path(path, output_format)
+    if os.path.isdir(path):
+        remove_spread_parts(path)
+    columns = {name: np.asarray(columns[name]) for name in SPREAD_COLUMNS}
+
+    if output_format == "json":
+        values = [columns[name].tolist() for name in SPREAD_COLUMNS]
+        data = [dict(zip(SPREAD_COLUMNS, row)) for row in zip(*values)]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+    elif output_format == "parquet":
+        pq.write_table(pa.table(columns), path, compression="zstd")
+    elif output_format == "arrow":
+        table = pa.table(columns)
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        # Uncompressed so that np.load reads each column lazily
+        np.savez(path, **columns)
+    return path
+
+
+def open_spread_writer(path, output_format, resume_state=None):
+    """
+    Open a streaming writer that appends spread points to disk one step batch at a time.
+
+    JSON is streamed into a single file with the same layout as `write_spread`. Columnar formats
+    write one part file per batch into a directory named like the single-file output
+    (e.g. `spread_points.parquet/part_00001.parquet`), so every finished batch is readable
+    even if the run dies later. `load_spread_points` reads both layouts.
+
+    Passing the `state()` of an earlier writer continues its output from that point, dropping
+    anything written after the state was taken.
+    """
+    output_format = resolve_spread_format(output_format)
+    path = spread_output_path(path, output_format)
+    if output_format == "json":
+        return JsonSpreadWriter(path, **(resume_state or {}))
+    return PartSpreadWriter(path, output_format, **(resume_state or {}))
+
+
+class JsonSpreadWriter:
+    """Streams spread batches into one JSON array, formatted like `json.dump(..., indent=2)`."""
+
+    def __init__(self, path, rows=0, offset=0):
+        self.path = path
+        self.rows = rows
+        if rows:
+            # Continue after the last row written before `offset`
+            self.file = open(path, "r+", encoding="utf-8")
+            self.file.seek(offset)
+            self.file.truncate()
+        else:
+            self.file = open(path, "w", encoding="utf-8")
+
+    def state(self):
+        return {"rows": self.rows, "offset": self.file.tell()}
+
+    def write(self, columns):
+        values = [np.asarray(columns[name]).tolist() for name in SPREAD_COLUMNS]
+        for row in zip(*values):
+            self.file.write("[\n" if self.rows == 0 else ",\n")
+            self.file.write(textwrap.indent(json.dumps(dict(zip(SPREAD_COLUMNS, row)), indent=2), "  "))
+            self.rows += 1
+        self.file.flush()
+
+    def close(self):
+        self.file.write("\n]" if self.rows else "[]")
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PartSpreadWriter:
+    """Writes each spread batch as a numbered part file inside the output directory."""
+
+    def __init__(self, path, output_format, first_part=1):
+        self.path = path
+        self.output_format = output_format
+        self.part = first_part
+        if os.path.isfile(path):
+            os.remove(path)  # single-file output of an earlier run
+        os.makedirs(path, exist_ok=True)
+        # Drop parts left behind by an earlier run from this part number on
+        for stale in list_spread_parts(path):
+            if part_number(stale) >= first_part:
+                os.remove(stale)
+
+    def write(self, columns):
+        suffix = SPREAD_FORMATS[self.output_format]
+        part_path = os.path.join(self.path, f"part_{self.part:05d}")
+        # Write under a temporary name so a crash never leaves a truncated part behind
+        written = write_spread(columns, part_path + ".tmp" + suffix, self.output_format)
+        os.replace(written, part_path + suffix)
+        self.part += 1
+
+    def state(self):
+        return {"first_part": self.part}
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def list_spread_parts(directory):
+    """Part files of a streamed spread output directory, in write order."""
+    parts = glob.glob(os.path.join(directory, "part_*.*"))
+    return sorted(part for part in parts if ".tmp." not in os.path.basename(part))
+
+
+def remove_spread_parts(directory):
+    """Delete a streamed spread output directory and its part files."""
+    for part in glob.glob(os.path.join(directory, "part_*.*")):
+        os.remove(part)
+    os.rmdir(directory)
+
+
+def part_number(part_path):
+    return int(os.path.basename(part_path).split("_")[1].split(".")[0])
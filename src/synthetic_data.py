@@ -0,0 +1,120 @@
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from shapely.geometry import Polygon
+from ignition_point import IgnitionPointSet
+from region import Region
+from spread_writer import SPREAD_COLUMNS
+
+# Default extent of generated data (lon/lat degrees), inside the Siberian study area
+DEFAULT_BOUNDS = (80.0, 50.0, 100.0, 65.0)
+NDVI_NODATA = -9999.0
+
+
+def write_ndvi_raster(path, bounds=DEFAULT_BOUNDS, resolution=0.01, seed=0, tiled=False, block_size=256):
+    """
+    Write a synthetic float32 NDVI GeoTIFF in WGS84, laid out like the MODIS raster.
+
+    Values form smooth patches between -0.2 and 0.9 plus noise, so a realistic share of spread
+    candidates is rejected by the NDVI threshold; a few circular lakes are nodata.
+
+    Parameters:
+    - path: Output GeoTIFF.
+    - bounds: (west, south, east, north) in degrees.
+    - resolution: Pixel size in degrees.
+    - seed: Seed of the noise and lake placement.
+    - tiled: Write an internally tiled GeoTIFF with `block_size` blocks (for "tiled" NDVI mode).
+
+    Returns:
+    - str: `path`.
+    """
+    rng = np.random.default_rng(seed)
+    west, south, east, north = bounds
+    width = int(round((east - west) / resolution))
+    height = int(round((north - south) / resolution))
+    lons = west + (np.arange(width) + 0.5) * resolution
+    lats = north - (np.arange(height) + 0.5) * resolution
+
+    profile = {
+        "driver": "GTiff", "dtype": "float32", "nodata": NDVI_NODATA, "width": width, "height": height,
+        "count": 1, "crs": "EPSG:4326", "transform": from_origin(west, north, resolution, resolution),
+    }
+    if tiled:
+        profile.update(tiled=True, blockxsize=block_size, blockysize=block_size)
+    lakes = [(rng.uniform(west, east), rng.uniform(south, north), rng.uniform(0.1, 0.5)) for _ in range(8)]
+
+    # Written in row bands so large rasters never exist in memory at once
+    with rasterio.open(path, "w", **profile) as dst:
+        band_rows = max(1, 2**22 // width)
+        for row0 in range(0, height, band_rows):
+            band_lats = lats[row0:row0 + band_rows, None]
+            ndvi = (0.35 + 0.3 * np.sin(np.radians(lons[None, :] * 25)) * np.cos(np.radians(band_lats * 31))
+                    + 0.15 * np.sin(np.radians((lons[None, :] + band_lats) * 97)))
+            ndvi = ndvi + rng.normal(0, 0.05, ndvi.shape)
+            for lon, lat, radius in lakes:
+                ndvi[(lons[None, :] - lon) ** 2 + (band_lats - lat) ** 2 < radius ** 2] = NDVI_NODATA
+            ndvi = np.where(ndvi == NDVI_NODATA, ndvi, np.clip(ndvi, -0.2, 0.9)).astype(np.float32)
+            dst.write(ndvi, 1, window=((row0, row0 + len(band_lats)), (0, width)))
+    return path
+
+
+def make_regions(count=6, bounds=DEFAULT_BOUNDS, vertices=2000, seed=0):
+    """
+    Generate irregular region polygons with `vertices` vertices each, one per cell of a grid over
+    `bounds`, with random weather attributes. Region boundaries do not touch, so some points
+    fall between regions as with real administrative borders.
+
+    Returns:
+    - list: Region objects named "Region 0", "Region 1", ...
+    """
+    rng = np.random.default_rng(seed)
+    west, south, east, north = bounds
+    columns = int(np.ceil(np.sqrt(count * (east - west) / (north - south))))
+    rows = int(np.ceil(count / columns))
+    cell_w, cell_h = (east - west) / columns, (north - south) / rows
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+
+    regions = []
+    for i in range(count):
+        center_x = west + (i % columns + 0.5) * cell_w
+        center_y = south + (i // columns + 0.5) * cell_h
+        # Radius wobbles with a few harmonics, staying within 60-95% of the half cell
+        phases = rng.uniform(0, 2 * np.pi, 3)
+        wobble = sum(np.sin(k * angles + phase) for k, phase in zip((3, 7, 29), phases)) / 3
+        radius = 0.775 + 0.175 * wobble
+        shell = np.column_stack([
+            center_x + radius * cell_w / 2 * np.cos(angles), center_y + radius * cell_h / 2 * np.sin(angles)
+        ])
+        regions.append(Region(
+            region_id=f"Region {i}",
+            geometry=Polygon(shell),
+            temperature=float(rng.uniform(15, 35)),
+            humidity=float(rng.uniform(20, 80)),
+            wind_speed=float(rng.uniform(0, 10)),
+            wind_direction=float(rng.uniform(0, 360)),
+        ))
+    return regions
+
+
+def make_ignitions(n, bounds=DEFAULT_BOUNDS, seed=0):
+    """Uniformly scattered ignition points with random weather, as an IgnitionPointSet."""
+    rng = np.random.default_rng(seed)
+    west, south, east, north = bounds
+    return IgnitionPointSet({
+        "x": rng.uniform(west, east, n),
+        "y": rng.uniform(south, north, n),
+        "temperature": np.round(rng.uniform(15, 40, n), 1),
+        "humidity": np.round(rng.uniform(10, 80, n), 1),
+        "wind_speed": np.round(rng.uniform(0, 12, n), 2),
+        "wind_direction": np.round(rng.uniform(0, 360, n), 1),
+    })
+
+
+def make_spread_columns(n, bounds=DEFAULT_BOUNDS, steps=10, seed=0):
+    """Synthetic spread output: a dict of SPREAD_COLUMNS arrays spread over `steps` steps."""
+    points = make_ignitions(n, bounds, seed)
+    rng = np.random.default_rng(seed + 1)
+    columns = {name: points.columns[name] for name in SPREAD_COLUMNS if name in points.columns}
+    columns["step"] = np.sort(rng.integers(1, steps + 1, n))
+    columns["ndvi"] = np.round(rng.uniform(0.15, 0.9, n), 3)
+    return {name: columns[name] for name in SPREAD_COLUMNS}
@@ -0,0 +1,374 @@
+import os
+import numpy as np
+from checkpoint import load_checkpoint, run_fingerprint, save_checkpoint
+from config import WIND_RANDOM_SPREAD
+from ignition_point import IgnitionPointSet
+from region_mask import RegionMask
+from simulator import FireSimulator
+from spread_writer import SPREAD_COLUMNS, open_spread_writer, write_spread
+
+WEATHER_COLUMNS = ["temperature", "humidity", "wind_speed", "wind_direction"]
+
+KM_PER_DEGREE = 111.32
+
+
+def points_to_columns(points, step=0):
+    """
+    Convert a list of point objects into a dict of NumPy column arrays.
+
+    Parameters:
+    - points: An IgnitionPointSet, objects exposing `x`, `y`, weather attributes and
+      `risk_score` (e.g. IgnitionPoint), or a dict of columns (returned unchanged).
+    - step: Step number assigned to every point.
+
+    Returns:
+    - dict: column name -> 1D array, with the keys listed in SPREAD_COLUMNS.
+    """
+    if isinstance(points, dict):
+        return points
+    if isinstance(points, IgnitionPointSet):
+        columns = {name: points.columns[name].copy() for name in SPREAD_COLUMNS}
+        columns["step"][:] = step
+        return columns
+    n = len(points)
+    columns = {
+        name: np.fromiter((getattr(p, name) for p in points), dtype=float, count=n)
+        for name in ["x", "y"] + WEATHER_COLUMNS + ["risk_score"]
+    }
+    columns["ndvi"] = np.fromiter(
+        (np.nan if getattr(p, "ndvi", None) is None else p.ndvi for p in points), dtype=float, count=n
+    )
+    columns["step"] = np.full(n, step, dtype=np.int64)
+    return columns
+
+
+def point_keys(x, y):
+    """
+    Pack coordinates rounded to 4 decimal places (the dedup key of FireSimulator) into int64 keys.
+    """
+    kx = np.round(np.asarray(x) * 1e4).astype(np.int64)
+    ky = np.round(np.asarray(y) * 1e4).astype(np.int64)
+    return kx * 10_000_000 + ky
+
+
+def first_occurrences(keys):
+    """Indices of the first occurrence of every distinct key, in their original order."""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    is_first = np.ones(len(keys), dtype=bool)
+    is_first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    return np.sort(order[is_first])
+
+
+def isin_sorted(keys, sorted_keys):
+    """Membership test against an already sorted key array, without re-sorting it."""
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=bool)
+    position = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[position] == keys
+
+
+def insert_sorted(sorted_keys, keys):
+    """Insert new, distinct keys into a sorted key array."""
+    keys = np.sort(keys)
+    return np.insert(sorted_keys, np.searchsorted(sorted_keys, keys), keys)
+
+
+def cell_keys(x, y, cell_size_km):
+    """
+    Spatial-hash keys of a grid with cells of roughly `cell_size_km` x `cell_size_km`.
+
+    Rows are bands of latitude; within a row, longitude cells are widened by 1/cos(latitude of
+    the row center) so they keep about the same width in km towards the poles.
+    """
+    cell_deg = cell_size_km / KM_PER_DEGREE
+    row = np.floor(np.asarray(y) / cell_deg)
+    row_lat = (row + 0.5) * cell_deg
+    col = np.floor(np.asarray(x) * np.cos(np.radians(row_lat)) / cell_deg)
+    return col.astype(np.int64) * 10_000_000 + row.astype(np.int64)
+
+
+class VectorizedFireSimulator(FireSimulator):
+    """
+    NumPy implementation of the FireSimulator spread model.
+
+    Instead of handling one burning point and one spread angle at a time, every step builds the
+    whole frontier of WIND_RANDOM_SPREAD candidates per burning point as arrays, then filters them
+    by NDVI, dedup and region containment in bulk. Random angles come from a seeded
+    `numpy.random.Generator`, so runs with the same seed are reproducible.
+
+    Parameters:
+    - regions, output: As for FireSimulator.
+    - seed: Seed (or SeedSequence) of the random generator.
+    - region_index: RegionIndex or RegionMask used for containment (built from `regions` if None).
+    - cell_size_km: Spatial-hash cell size; candidates landing in a burning or burned cell are
+      merged into it. None keeps FireSimulator's exact 4-decimal dedup.
+    - max_frontier: Optional per-step cap on new spread points, sampled with the seeded generator.
+    - output_format: Spread output format, see `FireSimulator.save_spread`.
+    - checkpoint_path: File receiving the run state every `checkpoint_every` steps. An
+      interrupted `simulate_fire` called again with the same ignitions and parameters resumes
+      from it with identical results; it is removed once the run completes.
+    - checkpoint_every: Checkpoint interval in steps (None disables checkpointing).
+    - risk_raster: Optional RiskRaster; spread points then take the risk of the cell they land in
+      (their parent's risk where the raster has none) instead of inheriting the parent's score.
+    - weather_field: Optional WeatherField; spread points then take the weather interpolated at
+      their location, and the risk computed from it, instead of their parent's. A risk raster
+      still takes precedence for the risk score.
+    - instrumentation: Instrumentation receiving per-step timers, counters and progress
+      (a new one by default).
+    """
+
+    def __init__(self, regions, output, seed=None, region_index=None, cell_size_km=None,
+                 max_frontier=None, output_format="json", checkpoint_path=None, checkpoint_every=None,
+                 risk_raster=None, weather_field=None, instrumentation=None):
+        super().__init__(
+            regions, output, region_index=region_index, output_format=output_format, instrumentation=instrumentation
+        )
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.cell_size_km = cell_size_km
+        self.max_frontier = max_frontier
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.risk_raster = risk_raster
+        self.weather_field = weather_field
+        self.burned_keys = np.empty(0, dtype=np.int64)
+        # Whole spread as columns, filled only by engines that collect it before `save_spread`
+        # (grid); this engine streams spread points to `output_path` instead
+        self.spread_columns = None
+        self.step_stats = []
+
+    def simulate_fire(self, ignition_points, ndvi_loader, steps=10, risk_threshold=0.4, max_distance=0.2):
+        """
+        Simulate fire spread over a series of steps, streaming each step's spread points to disk.
+        Spread points are not kept in memory; read them back from `output_path`.
+
+        Parameters:
+        - ignition_points: List of starting points for the fire (must support required attributes).
+        - ndvi_loader: An NDVILoader object with `get_ndvi_many(xs, ys)` method.
+        - steps: Number of simulation steps to run.
+        - risk_threshold: Minimum risk score required for fire to spread.
+        - max_distance: Base distance a fire can travel in one step (adjusted by wind).
+        """
+        self.ignition_points = ignition_points
+        checkpointing = self.checkpoint_path is not None and self.checkpoint_every
+        resume = None
+        if checkpointing:
+            fingerprint = run_fingerprint(
+                points_to_columns(ignition_points), steps=steps, risk_threshold=risk_threshold,
+                max_distance=max_distance, seed=self.seed, cell_size_km=self.cell_size_km,
+                max_frontier=self.max_frontier, output=self.output, output_format=self.output_format,
+                risk_raster=self.risk_raster is not None, weather_field=self.weather_field is not None
+            )
+            resume = load_checkpoint(self.checkpoint_path, fingerprint)
+            if resume is not None:
+                self.instrumentation.progress(
+                    f"Resuming from checkpoint {self.checkpoint_path}", force=True, step=resume["step"]
+                )
+
+        writer_state = resume["writer_state"] if resume is not None else None
+        with open_spread_writer(self.output, self.output_format, writer_state) as writer:
+            steps_run = self.iter_steps(ignition_points, ndvi_loader, steps, risk_threshold, max_distance, resume)
+            for step, spread in steps_run:
+                with self.instrumentation.timer("write"):
+                    writer.write(spread)
+                if checkpointing and step % self.checkpoint_every == 0:
+                    with self.instrumentation.timer("checkpoint"):
+                        save_checkpoint(
+                            self.checkpoint_path, fingerprint, step, spread, self.burned_keys, self.rng,
+                            self.step_stats, writer.state()
+                        )
+                    self.instrumentation.progress("💾 Checkpoint saved", force=True, step=step)
+        self.output_path = writer.path
+        if checkpointing and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        print(f"Saved fire spread results to {self.output_path}")
+
+    def run(self, frontier, ndvi_loader, steps=10, risk_threshold=0.4, max_distance=0.2):
+        """
+        Run the spread model and collect every step in memory.
+
+        Returns:
+        - dict: column arrays (SPREAD_COLUMNS) of every spread point, in step order.
+        """
+        return concat_columns([
+            spread for _, spread in self.iter_steps(frontier, ndvi_loader, steps, risk_threshold, max_distance)
+        ])
+
+    def iter_steps(self, ignition_points, ndvi_loader, steps=10, risk_threshold=0.4, max_distance=0.2,
+                   resume=None):
+        """
+        Run the spread model step by step, yielding each step's new frontier as soon as it is done.
+
+        Only the live frontier and the sorted burned-cell index (`burned_keys`) are kept between
+        steps, so memory does not grow with the history of earlier steps.
+
+        Parameters:
+        - ignition_points: IgnitionPointSet, list of IgnitionPoint or a dict of column arrays.
+        - resume: Checkpoint from `load_checkpoint`; the run continues after its step with its
+          frontier, burned cells and random generator state instead of starting from
+          `ignition_points`.
+        - Other parameters as for `simulate_fire`.
+
+        Yields:
+        - (step, columns): step number and the dict of SPREAD_COLUMNS arrays that ignited in it.
+        """
+        if resume is None:
+            frontier = points_to_columns(ignition_points)
+            self.burned_keys = np.empty(0, dtype=np.int64)
+            self.step_stats = []
+            first_step = 1
+        else:
+            frontier = resume["frontier"]
+            self.burned_keys = resume["burned"]
+            self.rng.bit_generator.state = resume["rng_state"]
+            self.step_stats = resume["step_stats"]
+            first_step = resume["step"] + 1
+        instrumentation = self.instrumentation
+        for step in range(first_step, steps + 1):
+            instrumentation.start_step(step)
+
+            # Burn every frontier point once, skipping cells that already burned
+            with instrumentation.timer("dedup"):
+                keys = self.cell_keys(frontier["x"], frontier["y"])
+                first = first_occurrences(keys)
+                fresh = first[~isin_sorted(keys[first], self.burned_keys)]
+                self.burned_keys = insert_sorted(self.burned_keys, keys[fresh])
+            instrumentation.count("dedup_hits", len(keys) - len(fresh))
+
+            with instrumentation.timer("candidates"):
+                active = fresh[frontier["risk_score"][fresh] >= risk_threshold]
+                candidates = self._spread_candidates(frontier, active, max_distance)
+            stats = {"step": step, "frontier": len(keys), "candidates": len(candidates["x"])}
+            instrumentation.count("candidates", stats["candidates"])
+
+            # Merge candidates landing in a burning/burned cell or in a cell another candidate took
+            with instrumentation.timer("dedup"):
+                keys = self.cell_keys(candidates["x"], candidates["y"])
+                first = first_occurrences(keys)
+                keep = first[~isin_sorted(keys[first], self.burned_keys)]
+                stats["merged"] = stats["candidates"] - len(keep)
+                candidates = take_columns(candidates, keep)
+            instrumentation.count("dedup_hits", stats["merged"])
+
+            # Check NDVI and ensure the points lie in a valid region
+            candidates = self._filter_burnable(candidates, ndvi_loader)
+
+            # Frontier budget: keep a seeded random subset, in candidate order
+            stats["capped"] = 0
+            if self.max_frontier is not None and len(candidates["x"]) > self.max_frontier:
+                stats["capped"] = len(candidates["x"]) - self.max_frontier
+                instrumentation.count("capped", stats["capped"])
+                keep = np.sort(self.rng.choice(len(candidates["x"]), self.max_frontier, replace=False))
+                candidates = take_columns(candidates, keep)
+
+            stats["spread"] = len(candidates["x"])
+            self.step_stats.append(stats)
+
+            if len(candidates["x"]) == 0:
+                instrumentation.end_step(frontier=stats["frontier"], spread=0, merged=stats["merged"])
+                instrumentation.progress("No further spread", force=True, step=step)
+                break
+
+            # Spread points inherit their parent's weather and risk
+            with instrumentation.timer("weather"):
+                frontier = {
+                    name: frontier[name][candidates["parent"]] for name in WEATHER_COLUMNS + ["risk_score"]
+                }
+                if self.weather_field is not None:
+                    frontier.update(self.weather_field.sample(candidates["x"], candidates["y"]))
+                if self.risk_raster is not None:
+                    cell_risk = self.risk_raster.risk_at(candidates["x"], candidates["y"])
+                    frontier["risk_score"] = np.where(np.isnan(cell_risk), frontier["risk_score"], cell_risk)
+                frontier.update(
+                    x=candidates["x"], y=candidates["y"], ndvi=candidates["ndvi"],
+                    step=np.full(len(candidates["x"]), step, dtype=np.int64)
+                )
+            instrumentation.end_step(frontier=stats["frontier"], spread=stats["spread"], merged=stats["merged"])
+            yield step, frontier
+
+    def cell_keys(self, x, y):
+        """Dedup keys: spatial-hash cells of `cell_size_km`, or 4-decimal rounding when unset."""
+        if self.cell_size_km is None:
+            return point_keys(x, y)
+        return cell_keys(x, y, self.cell_size_km)
+
+    def _spread_candidates(self, frontier, active, max_distance):
+        """
+        Generate WIND_RANDOM_SPREAD wind-biased spread candidates for every active frontier point.
+
+        Returns:
+        - dict with candidate `x`, `y` and the frontier index of their `parent`; the remaining
+          columns are only gathered for candidates that survive filtering.
+        """
+        wind_direction = frontier["wind_direction"][active][:, None]
+
+        # Random spread angles within ±90° of the wind direction
+        angle = wind_direction + self.rng.uniform(-90, 90, size=(len(active), WIND_RANDOM_SPREAD))
+        angle_diff = np.abs((angle - wind_direction + 180) % 360 - 180)
+        wind_factor = np.cos(np.radians(angle_diff))
+        distance = max_distance * (1 + 0.6 * wind_factor)
+
+        # Correct for latitude since degrees of longitude are narrower near poles
+        lat_correction = np.cos(np.radians(frontier["y"][active]))[:, None]
+        dx = distance * np.cos(np.radians(angle)) / lat_correction
+        dy = distance * np.sin(np.radians(angle))
+
+        return {
+            "x": (frontier["x"][active][:, None] + dx).ravel(),
+            "y": (frontier["y"][active][:, None] + dy).ravel(),
+            "parent": np.repeat(active, WIND_RANDOM_SPREAD),
+        }
+
+    def _filter_burnable(self, candidates, ndvi_loader):
+        """
+        Keep candidates with NDVI >= 0.15 that lie inside a region. When the region lookup is a
+        RegionMask on the NDVI grid, both checks read the same cell indices.
+        """
+        with self.instrumentation.timer("ndvi"):
+            rows, cols, inside = ndvi_loader.index(candidates["x"], candidates["y"])
+            candidates["ndvi"] = ndvi_loader.get_ndvi_cells(rows, cols, inside)
+            keep = np.flatnonzero(candidates["ndvi"] >= 0.15)
+            candidates = take_columns(candidates, keep)
+        self.instrumentation.count("ndvi_lookups", len(rows))
+        self.instrumentation.count("ndvi_rejects", len(rows) - len(keep))
+
+        with self.instrumentation.timer("region"):
+            if isinstance(self.region_index, RegionMask) and self.region_index.matches(ndvi_loader):
+                in_region = self.region_index.locate_cells(rows[keep], cols[keep], inside[keep]) >= 0
+            else:
+                in_region = self.region_index.contains_many(candidates["x"], candidates["y"])
+        self.instrumentation.count("region_rejects", len(in_region) - int(in_region.sum()))
+        return take_columns(candidates, np.flatnonzero(in_region))
+
+    def spread_to_columns(self):
+        if self.spread_columns is None:
+            raise RuntimeError(
+                f"{type(self).__name__} streams spread points to its output file as it runs and keeps "
+                "none in memory; read them back with `load_spread_points(output_path)`"
+            )
+        return self.spread_columns
+
+    def save_spread_to_json(self):
+        """
+        Save spread points to a JSON file in the same layout as FireSimulator.
+        """
+        write_spread(self.spread_to_columns(), self.output, "json")
+        print(f"Saved fire spread results to {self.output}")
+
+
+def empty_columns():
+    columns = {name: np.empty(0) for name in SPREAD_COLUMNS}
+    columns["step"] = np.empty(0, dtype=np.int64)
+    return columns
+
+
+def concat_columns(batches):
+    """Concatenate a list of column dicts (an empty list gives empty columns)."""
+    if not batches:
+        return empty_columns()
+    return {name: np.concatenate([b[name] for b in batches]) for name in SPREAD_COLUMNS}
+
+
+def take_columns(columns, index):
+    return {name: values[index] for name, values in columns.items()}
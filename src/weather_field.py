@@ -0,0 +1,75 @@
+import numpy as np
+from ignition_point import compute_risk_scores
+
+SCALAR_FIELDS = ["temperature", "humidity", "wind_speed"]
+
+
+class WeatherField:
+    """
+    Weather on a regular lat/lon grid, interpolated bilinearly to any number of points at once.
+
+    Wind direction is stored as unit vector components (`wind_u`, `wind_v`) and interpolated
+    component-wise, so directions on either side of 0°/360° average correctly; wind speed is
+    interpolated as a scalar.
+
+    Parameters:
+    - lats, lons: Ascending 1D node coordinates (at least two each).
+    - fields: dict of 2D (len(lats), len(lons)) arrays: `temperature`, `humidity`, `wind_speed`
+      and either `wind_direction` (degrees) or `wind_u`/`wind_v`.
+    """
+    def __init__(self, lats, lons, fields):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.fields = {name: np.asarray(fields[name], dtype=float) for name in SCALAR_FIELDS}
+        if "wind_u" in fields:
+            self.fields["wind_u"] = np.asarray(fields["wind_u"], dtype=float)
+            self.fields["wind_v"] = np.asarray(fields["wind_v"], dtype=float)
+        else:
+            direction = np.radians(np.asarray(fields["wind_direction"], dtype=float))
+            self.fields["wind_u"] = np.cos(direction)
+            self.fields["wind_v"] = np.sin(direction)
+
+    @classmethod
+    def load(cls, path):
+        """Read a field written by `save`."""
+        with np.load(path) as data:
+            return cls(data["lats"], data["lons"], {name: data[name] for name in data.files})
+
+    def save(self, path):
+        """Write the grid and its fields to a compressed .npz file."""
+        np.savez_compressed(path, lats=self.lats, lons=self.lons, **self.fields)
+
+    def interpolate(self, xs, ys):
+        """
+        Bilinear interpolation at WGS84 points; points outside the grid take the nearest edge.
+
+        Returns:
+        - dict: `temperature`, `humidity`, `wind_speed` and `wind_direction` (degrees in [0, 360))
+          arrays, one value per point.
+        """
+        row, row_t = _grid_position(self.lats, ys)
+        col, col_t = _grid_position(self.lons, xs)
+        weights = [
+            ((1 - row_t) * (1 - col_t), 0, 0), ((1 - row_t) * col_t, 0, 1),
+            (row_t * (1 - col_t), 1, 0), (row_t * col_t, 1, 1),
+        ]
+        values = {}
+        for name, grid in self.fields.items():
+            values[name] = sum(weight * grid[row + drow, col + dcol] for weight, drow, dcol in weights)
+        # Rounding first keeps tiny negative angles from wrapping to 360
+        direction = np.round(np.degrees(np.arctan2(values.pop("wind_v"), values.pop("wind_u"))), 6) % 360
+        values["wind_direction"] = direction
+        return values
+
+    def sample(self, xs, ys):
+        """Interpolated weather plus the risk score computed from it, as column arrays."""
+        values = self.interpolate(xs, ys)
+        values["risk_score"] = compute_risk_scores(values)
+        return values
+
+
+def _grid_position(nodes, coords):
+    """Index of the lower grid node and the fractional offset towards the next one."""
+    position = np.interp(np.asarray(coords, dtype=float), nodes, np.arange(len(nodes)))
+    lower = np.minimum(np.floor(position).astype(np.int64), len(nodes) - 2)
+    return lower, position - lower
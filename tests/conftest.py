@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The modules live flat in src/ and src/scripts/ and are imported as top-level modules, as when
+# running from those directories
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path[:0] = [SRC, os.path.join(SRC, "scripts")]
@@ -0,0 +1,74 @@
+import os
+import pytest
+import synthetic_data
+import vectorized_simulator
+from ndvi_loader import NDVILoader
+from spread_writer import list_spread_parts
+from vectorized_simulator import VectorizedFireSimulator
+
+BOUNDS = (80.0, 50.0, 84.0, 53.0)
+RUN = {"steps": 5, "risk_threshold": 0.4, "max_distance": 0.05}
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture(scope="module")
+def scenario(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("checkpoint")
+    ndvi_path = synthetic_data.write_ndvi_raster(str(workdir / "ndvi.tif"), bounds=BOUNDS, resolution=0.01)
+    regions = synthetic_data.make_regions(count=4, bounds=BOUNDS, vertices=200)
+    return regions, NDVILoader(ndvi_path, mode="memory"), synthetic_data.make_ignitions(60, bounds=BOUNDS, seed=1)
+
+
+def run(scenario, output, output_format, checkpoint_path=None):
+    regions, ndvi_loader, ignitions = scenario
+    sim = VectorizedFireSimulator(
+        regions, output, seed=7, max_frontier=2000, output_format=output_format,
+        checkpoint_path=checkpoint_path, checkpoint_every=1
+    )
+    sim.simulate_fire(ignitions, ndvi_loader, **RUN)
+    return sim
+
+
+def output_files(path):
+    files = list_spread_parts(path) if os.path.isdir(path) else [path]
+    return [(os.path.basename(file), open(file, "rb").read()) for file in files]
+
+
+@pytest.mark.parametrize("output_format", ["json", "parquet"])
+def test_resumed_run_matches_uninterrupted_run(scenario, tmp_path, monkeypatch, output_format):
+    for name in ("expected", "resumed"):
+        os.makedirs(tmp_path / name)
+    expected = run(scenario, str(tmp_path / "expected" / "spread.json"), output_format)
+    assert len(expected.step_stats) == RUN["steps"]
+
+    # Die in the last step after its spread was written but before its checkpoint was saved
+    save_checkpoint = vectorized_simulator.save_checkpoint
+
+    def crash_in_last_step(path, fingerprint, step, *args):
+        if step == RUN["steps"]:
+            raise Interrupted()
+        save_checkpoint(path, fingerprint, step, *args)
+
+    output = str(tmp_path / "resumed" / "spread.json")
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    monkeypatch.setattr(vectorized_simulator, "save_checkpoint", crash_in_last_step)
+    with pytest.raises(Interrupted):
+        run(scenario, output, output_format, checkpoint_path)
+    assert os.path.exists(checkpoint_path)
+    # A hard kill can also leave a torn tail behind: half a JSON row or a stray part file
+    if output_format == "json":
+        with open(output, "a", encoding="utf-8") as file:
+            file.write(',\n  {\n    "x": 8')
+    else:
+        spread_dir = os.path.splitext(output)[0] + ".parquet"
+        with open(os.path.join(spread_dir, "part_00099.parquet"), "wb") as file:
+            file.write(b"torn")
+
+    monkeypatch.setattr(vectorized_simulator, "save_checkpoint", save_checkpoint)
+    resumed = run(scenario, output, output_format, checkpoint_path)
+    assert not os.path.exists(checkpoint_path)
+    assert resumed.step_stats == expected.step_stats
+    assert output_files(resumed.output_path) == output_files(expected.output_path)
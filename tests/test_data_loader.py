@@ -0,0 +1,49 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+from shapely.geometry import box
+import data_loader
+
+
+def write_regions(path, **columns):
+    gdf = gpd.GeoDataFrame(
+        {"NAME_1": ["A", "B"], **columns}, geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1)], crs="EPSG:4326"
+    )
+    gdf.to_file(path, driver="GeoJSON")
+    return str(path)
+
+
+def region_values(regions):
+    return [
+        (r.region_id, r.geometry.wkt, r.temperature, r.humidity, r.wind_speed, r.wind_direction) for r in regions
+    ]
+
+
+@pytest.mark.parametrize("columns", [
+    {},
+    {"temperature": [30.0, None]},
+    {"wind_direction": ["N", "SW"]},
+    {"temperature": [30.0, 25.0], "humidity": [40.0, 60.0], "wind_speed": [3.0, None], "wind_direction": [90.0, 180.0]},
+], ids=["name_only", "missing_value", "text_column", "all_columns"])
+def test_region_cache_round_trip(tmp_path, monkeypatch, columns):
+    path = write_regions(tmp_path / "regions.geojson", **columns)
+    built = data_loader.load_regions(path, cache=True)
+    cache_path = data_loader.default_regions_cache_path(path)
+    with np.load(cache_path) as cached:  # no object arrays, so no pickle needed
+        assert all(cached[name].dtype != object for name in cached.files)
+
+    def read_table(*args, **kwargs):
+        raise AssertionError("regions should come from the cache")
+
+    monkeypatch.setattr(data_loader, "read_table", read_table)
+    reloaded = data_loader.load_regions(path, cache=True)
+    assert region_values(reloaded) == region_values(built)
+
+
+def test_region_cache_keeps_missing_values(tmp_path):
+    path = write_regions(tmp_path / "regions.geojson", temperature=[30.0, None], wind_direction=["N", "SW"])
+    data_loader.load_regions(path, cache=True)
+    a, b = data_loader.load_regions(path, cache=True)
+    assert (a.temperature, b.temperature) == (30.0, None)
+    assert (a.humidity, a.wind_speed) == (None, 0.0)
+    assert (a.wind_direction, b.wind_direction) == ("N", "SW")
@@ -0,0 +1,20 @@
+import multiprocessing
+import pytest
+import ndvi_loader
+import synthetic_data
+
+
+def registry_size():
+    return len(ndvi_loader._shared_loaders)
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_forked_process_opens_its_own_shared_loader(tmp_path):
+    path = synthetic_data.write_ndvi_raster(str(tmp_path / "ndvi.tif"), bounds=(80.0, 50.0, 81.0, 51.0))
+    parent = ndvi_loader.get_shared_loader(path, "tiled")
+    try:
+        with multiprocessing.get_context("fork").Pool(1) as pool:
+            assert pool.apply(registry_size) == 0
+        assert ndvi_loader.get_shared_loader(path, "tiled") is parent
+    finally:
+        ndvi_loader.close_shared_loaders()
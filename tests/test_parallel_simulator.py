@@ -0,0 +1,53 @@
+import geopandas as gpd
+import pandas as pd
+import pytest
+import synthetic_data
+from ndvi_loader import NDVILoader
+from parallel_simulator import ParallelFireSimulator
+from spread_loader import load_spread_points
+from vectorized_simulator import VectorizedFireSimulator
+
+BOUNDS = (80.0, 50.0, 84.0, 53.0)
+RUN = {"steps": 4, "risk_threshold": 0.4, "max_distance": 0.05}
+
+
+@pytest.fixture(scope="module")
+def scenario(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("parallel")
+    ndvi_path = synthetic_data.write_ndvi_raster(str(workdir / "ndvi.tif"), bounds=BOUNDS, resolution=0.01)
+    regions = synthetic_data.make_regions(count=4, bounds=BOUNDS, vertices=200)
+    regions_path = str(workdir / "regions.geojson")
+    gpd.GeoDataFrame({
+        "NAME_1": [r.region_id for r in regions],
+        **{name: [getattr(r, name) for r in regions]
+           for name in ["temperature", "humidity", "wind_speed", "wind_direction"]},
+    }, geometry=[r.geometry for r in regions], crs="EPSG:4326").to_file(regions_path, driver="GeoJSON")
+    ignitions = synthetic_data.make_ignitions(60, bounds=BOUNDS, seed=1)
+    return workdir, regions, regions_path, ndvi_path, ignitions
+
+
+def spread_frame(path):
+    frame = load_spread_points(path)
+    return pd.DataFrame(frame.drop(columns="geometry")).reset_index(drop=True)
+
+
+def run_vectorized(scenario):
+    workdir, regions, _, ndvi_path, ignitions = scenario
+    sim = VectorizedFireSimulator(regions, str(workdir / "vectorized.json"), seed=7, max_frontier=2000)
+    sim.simulate_fire(ignitions, NDVILoader(ndvi_path, mode="memory"), **RUN)
+    return spread_frame(sim.output_path), sim.step_stats
+
+
+@pytest.mark.parametrize("partition", ["region", "tile"])
+def test_parallel_output_does_not_depend_on_workers(scenario, partition):
+    workdir, regions, regions_path, ndvi_path, ignitions = scenario
+    expected, expected_stats = run_vectorized(scenario)
+    assert len(expected) > 0
+    for workers in (1, 3):
+        sim = ParallelFireSimulator(
+            regions, str(workdir / f"parallel_{partition}_{workers}.json"), seed=7, max_frontier=2000,
+            workers=workers, partition=partition, tile_size=1.0, regions_path=regions_path, ndvi_path=ndvi_path
+        )
+        sim.simulate_fire(ignitions, NDVILoader(ndvi_path, mode="memory"), **RUN)
+        pd.testing.assert_frame_equal(spread_frame(sim.output_path), expected)
+        assert sim.step_stats == expected_stats
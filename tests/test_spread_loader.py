@@ -0,0 +1,14 @@
+import json
+import synthetic_data
+from map_renderer import render_fire_map_html
+from spread_loader import load_spread_points
+
+
+def test_empty_json_spread_loads_and_renders(tmp_path):
+    path = tmp_path / "spread_points.json"
+    path.write_text(json.dumps([]))
+    spread = load_spread_points(str(path), columns=["step", "ndvi"])
+    assert len(spread) == 0
+    assert list(spread.columns) == ["x", "y", "step", "ndvi", "geometry"]
+    render_fire_map_html(synthetic_data.make_regions(count=1, vertices=50), spread_points=spread, output_path=str(tmp_path / "map.html"))
+    assert (tmp_path / "map.html").exists()
@@ -0,0 +1,95 @@
+import asyncio
+import socket
+import time
+import geopandas as gpd
+import pytest
+from aiohttp import web
+from shapely.geometry import Point
+import weather_loader
+from weather_cache import WeatherCache
+from weather_client import parse_current
+from weather_stub_server import current_weather_payload, make_app
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Point the loader at a stub server; `stub(coro_factory, **app_options)` runs against it."""
+    monkeypatch.setattr(weather_loader, "WEATHERAPI_KEY", "test")
+
+    def run(coro_factory, **app_options):
+        async def main():
+            port = free_port()
+            app = make_app(**app_options)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            await web.TCPSite(runner, "127.0.0.1", port).start()
+            monkeypatch.setattr(weather_loader, "WEATHERAPI_BASE_URL", f"http://127.0.0.1:{port}/v1")
+            try:
+                result = await coro_factory(weather_loader.make_client())
+            finally:
+                await runner.cleanup()
+            return result, app["state"]["served"]
+        return asyncio.run(main())
+    return run
+
+
+def ignitions():
+    # Two detections share a grid cell of WEATHER_GRID_DEG (0.01°), the third has its own
+    points = [Point(90.0011, 60.0012), Point(90.0013, 60.0009), Point(91.5, 61.25)]
+    return gpd.GeoDataFrame(geometry=points, crs="EPSG:4326")
+
+
+def test_points_are_fetched_once_per_cell_and_cached(stub, tmp_path):
+    cache_path = str(tmp_path / "weather.sqlite")
+    gdf = ignitions()
+
+    def enrich(client):
+        return weather_loader.enrich_points(client, gdf, cache, fallback_points)
+
+    fallback_points = []
+    with WeatherCache(cache_path, weather_loader.GRID_DEG) as cache:
+        weather, served = stub(enrich)
+    assert served == 2
+    assert fallback_points == []
+    assert weather["temperature"][0] == weather["temperature"][1]
+    for name, value in parse_current(current_weather_payload(61.25, 91.5)).items():
+        assert weather[name][2] == value
+
+    # A second run within the TTL is served from the cache
+    with WeatherCache(cache_path, weather_loader.GRID_DEG) as cache:
+        cached, served = stub(enrich)
+    assert served == 0
+    assert cached == weather
+
+    # Rows older than the TTL are fetched again
+    with WeatherCache(cache_path, weather_loader.GRID_DEG) as cache:
+        cache.connection.execute(
+            "UPDATE weather SET fetched_at = ? WHERE lat_key = ?",
+            (time.time() - (weather_loader.CACHE_TTL_HOURS + 1) * 3600, 6125)
+        )
+        cache.connection.commit()
+    with WeatherCache(cache_path, weather_loader.GRID_DEG, weather_loader.CACHE_TTL_HOURS) as cache:
+        refreshed, served = stub(enrich)
+    assert served == 1
+    assert refreshed == weather
+
+
+def test_failed_cells_are_not_cached(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(weather_loader, "MAX_RETRIES", 0)
+    cell_keys = [(6000, 9000)]
+    fallback_points = []
+    with WeatherCache(str(tmp_path / "weather.sqlite"), 0.01) as cache:
+        weather, served = stub(
+            lambda client: weather_loader.fetch_cells(client, cell_keys, 0.01, cache, fallback_points),
+            error_rate=1.0
+        )
+        assert served == 1
+        assert weather == {(6000, 9000): weather_loader.FALLBACK_WEATHER}
+        assert fallback_points == [(60.0, 90.0)]
+        assert cache.get_many(cell_keys) == {}